@@ -12,7 +12,7 @@ import json
 import os
 
 # Import rate limiter components
-from rate_limiter import RateLimitedAPIClient, APIMonitor, DataCache
+from rate_limiter import RateLimitedAPIClient, APIMonitor
 
 app = FastAPI(
     title="Dividend Income Pro API",
@@ -377,7 +377,7 @@ async def get_rate_limit_health():
 @app.post("/api/cache/clear")
 async def clear_expired_cache():
     """Clear expired cache entries"""
-    cache = DataCache()
+    cache = RateLimitedAPIClient.get_shared_cache()
     deleted = cache.clear_expired()
     return {
         "message": f"Cleared {deleted} expired cache entries",
@@ -388,7 +388,7 @@ async def clear_expired_cache():
 @app.get("/api/cache/stats")
 async def get_cache_stats():
     """Get cache statistics"""
-    cache = DataCache()
+    cache = RateLimitedAPIClient.get_shared_cache()
     return {
         "timestamp": datetime.now().isoformat(),
         "stats": cache.get_stats()
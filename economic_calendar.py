@@ -50,10 +50,11 @@ class EconomicCalendar:
         
         # Turkish Central Bank Meetings
         for date_str in self.cbt_meetings_2025:
-            event_date = datetime.strptime(date_str, "%Y-%m-%d")
+            event_date = datetime.fromisoformat(date_str)
             if today <= event_date <= cutoff_date:
                 events.append({
                     'date': date_str,
+                    'days_until': (event_date - today).days,
                     'event': 'TCMB Interest Rate Decision',
                     'country': 'Turkey',
                     'importance': 'high',
@@ -62,10 +63,11 @@ class EconomicCalendar:
         
         # Turkish Inflation Data
         for date_str in self.inflation_dates_2025:
-            event_date = datetime.strptime(date_str, "%Y-%m-%d")
+            event_date = datetime.fromisoformat(date_str)
             if today <= event_date <= cutoff_date:
                 events.append({
                     'date': date_str,
+                    'days_until': (event_date - today).days,
                     'event': 'Turkey CPI (Inflation) Data',
                     'country': 'Turkey',
                     'importance': 'high',
@@ -74,10 +76,11 @@ class EconomicCalendar:
         
         # Fed Meetings
         for date_str in self.fed_meetings_2025:
-            event_date = datetime.strptime(date_str, "%Y-%m-%d")
+            event_date = datetime.fromisoformat(date_str)
             if today <= event_date <= cutoff_date:
                 events.append({
                     'date': date_str,
+                    'days_until': (event_date - today).days,
                     'event': 'FOMC Interest Rate Decision',
                     'country': 'USA',
                     'importance': 'high',
@@ -86,10 +89,11 @@ class EconomicCalendar:
         
         # ECB Meetings
         for date_str in self.ecb_meetings_2025:
-            event_date = datetime.strptime(date_str, "%Y-%m-%d")
+            event_date = datetime.fromisoformat(date_str)
             if today <= event_date <= cutoff_date:
                 events.append({
                     'date': date_str,
+                    'days_until': (event_date - today).days,
                     'event': 'ECB Interest Rate Decision',
                     'country': 'Eurozone',
                     'importance': 'high',
@@ -107,14 +111,7 @@ class EconomicCalendar:
         upcoming = self.get_upcoming_events(days_ahead=90)
         
         if upcoming:
-            next_event = upcoming[0]
-            event_date = datetime.strptime(next_event['date'], "%Y-%m-%d")
-            days_until = (event_date - datetime.now()).days
-            
-            return {
-                **next_event,
-                'days_until': days_until
-            }
+            return upcoming[0]
         
         return {'event': 'No upcoming events', 'days_until': None}
     
@@ -142,7 +139,7 @@ class EconomicCalendar:
         
         current_week = None
         for event in events:
-            event_date = datetime.strptime(event['date'], "%Y-%m-%d")
+            event_date = datetime.fromisoformat(event['date'])
             week = event_date.strftime("%Y-W%W")
             
             if week != current_week:
@@ -150,8 +147,7 @@ class EconomicCalendar:
                 summary += "-" * 60 + "\n"
                 current_week = week
             
-            days_until = (event_date - datetime.now()).days
-            summary += f"  {event['date']} ({days_until} days): "
+            summary += f"  {event['date']} ({event['days_until']} days): "
             summary += f"{event['event']} [{event['country']}]\n"
         
         return summary
@@ -162,13 +158,11 @@ class EconomicCalendar:
         
         alerts = []
         for event in upcoming:
-            event_date = datetime.strptime(event['date'], "%Y-%m-%d")
-            days_until = (event_date - datetime.now()).days
+            days_until = event['days_until']
             
             if days_until <= alert_days:
                 alerts.append({
                     **event,
-                    'days_until': days_until,
                     'alert_message': f"Alert: {event['event']} in {days_until} day(s)"
                 })
         
@@ -7,7 +7,7 @@ import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from rate_limiter import RateLimitedAPIClient, DataCache, APICallTracker
+from rate_limiter import RateLimitedAPIClient, APICallTracker
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +30,7 @@ class FinancialDataFetcher:
             'alpha_vantage': RateLimitedAPIClient.get_client('alpha_vantage'),
             'iex_cloud': RateLimitedAPIClient.get_client('iex_cloud'),
         }
-        self.cache = DataCache()
+        self.cache = RateLimitedAPIClient.get_shared_cache()
     
     # ============ STOCK QUOTE METHODS ============
     
@@ -442,10 +442,7 @@ class FinancialDataFetcher:
     
     def get_all_stats(self) -> Dict:
         """Get comprehensive statistics about API usage"""
-        stats = {}
-        for source, client in self.clients.items():
-            stats[source] = client.get_stats()
-        return stats
+        return RateLimitedAPIClient.get_stats_for(self.clients)
     
     def print_stats(self):
         """Print formatted API usage statistics"""
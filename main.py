@@ -4,6 +4,10 @@ Coordinates all modules and generates comprehensive market reports.
 """
 
 import os
+import math
+import time
+import shelve
+from hashlib import blake2b
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
@@ -24,6 +28,7 @@ from macro_regime_detector import MacroRegimeDetector
 from geopolitical_monitor import GeopoliticalMonitor
 from portfolio_analyzer import PortfolioAnalyzer
 from alert_engine import AlertEngine
+from rate_limiter import RateLimitedAPIClient
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -48,8 +53,57 @@ class AntigravityOrchestrator:
         self.portfolio_analyzer = PortfolioAnalyzer()
         self.alert_engine = AlertEngine()
         
+        # Sentiment scores persisted across runs, keyed by article link
+        os.makedirs('data', exist_ok=True)
+        self.sentiment_scores = shelve.open('data/sentiment_scores')
+        self.sentiment_score_max_age = 7  # days
+        self._prune_sentiment_scores()
+        
+        # Recent reports keyed by news fingerprint, so retries are served from cache
+        self.report_cache = RateLimitedAPIClient.get_shared_cache()
+        self.report_cache_ttl = 10  # minutes
+        
         logger.info("All modules initialized successfully.")
     
+    def close(self):
+        """Close the sentiment score shelf and the price fetch pool."""
+        self.sentiment_scores.close()
+        self.price_integrator.close()
+    
+    def __enter__(self) -> 'AntigravityOrchestrator':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _prune_sentiment_scores(self):
+        """Drop sentiment scores older than sentiment_score_max_age (and untimestamped ones)."""
+        cutoff = time.time() - self.sentiment_score_max_age * 86400
+        stale = [link for link, entry in self.sentiment_scores.items()
+                 if entry.get('scored_at', 0) < cutoff]
+        for link in stale:
+            del self.sentiment_scores[link]
+        if stale:
+            logger.info(f"Pruned {len(stale)} old sentiment scores.")
+    
+    @staticmethod
+    def _report_fingerprint(articles: List[Dict[str, Any]], indices: Dict[str, Any]) -> str:
+        """
+        Hash the article links plus a coarse index snapshot.
+        
+        Index moves are bucketed to 0.25%, so a retry with the same news and a
+        quiet market maps to the same key while a real move forces a fresh report.
+        """
+        links = sorted(a.get('link', '') for a in articles)
+        snapshot = []
+        for name, data in sorted(indices.items()):
+            # Missing quotes, None and NaN (cached NaN comes back as null) all hash as None
+            change = data.get('change_percent') if data else None
+            finite = isinstance(change, (int, float)) and math.isfinite(change)
+            bucket = round(change * 4) / 4 if finite else None
+            snapshot.append(f"{name}:{bucket}")
+        return blake2b('\n'.join(links + snapshot).encode(), digest_size=16).hexdigest()
+    
     def generate_morning_report(self) -> Dict[str, Any]:
         """Generate comprehensive morning market report."""
         logger.info("Generating morning report...")
@@ -64,20 +118,33 @@ class AntigravityOrchestrator:
         logger.info("Fetching news...")
         news = self.news_aggregator.aggregate_all_news(hours_back=12)
         all_articles = news['rss'] + news['finnhub'] + news['turkish']
-        report['sections']['news_count'] = len(all_articles)
-        
-        # 2. Sentiment analysis
-        logger.info("Analyzing sentiment...")
-        sentiment = self.sentiment_analyzer.aggregate_sentiment(all_articles[:50])
-        report['sections']['sentiment'] = sentiment
         
-        # 3. Get market prices
+        # Index levels feed both the cache key and section 3
         logger.info("Fetching market prices...")
         indices = {
             'SP500': self.price_integrator.get_index_data('SP500'),
             'NASDAQ': self.price_integrator.get_index_data('NASDAQ'),
             'BIST100': self.price_integrator.get_index_data('BIST100')
         }
+        
+        # Same news and index snapshot within the TTL (e.g. a retry) -> reuse the previous report
+        fingerprint = self._report_fingerprint(all_articles, indices)
+        cached_report = self.report_cache.get('morning_report', fingerprint)
+        if cached_report is not None:
+            logger.info("News and markets unchanged since last run, serving cached morning report.")
+            return cached_report
+        
+        report['sections']['news_count'] = len(all_articles)
+        
+        # 2. Sentiment analysis
+        logger.info("Analyzing sentiment...")
+        sentiment = self.sentiment_analyzer.aggregate_sentiment(
+            all_articles[:50], score_cache=self.sentiment_scores
+        )
+        self.sentiment_scores.sync()
+        report['sections']['sentiment'] = sentiment
+        
+        # 3. Market prices (fetched above)
         report['sections']['indices'] = indices
         
         # 4. Turkish stocks
@@ -119,14 +186,14 @@ class AntigravityOrchestrator:
         
         # Check calendar alerts
         for event in upcoming_events[:3]:
-            event_date = datetime.strptime(event['date'], "%Y-%m-%d")
-            days_until = (event_date - datetime.now()).days
-            alert = self.alert_engine.check_economic_calendar_alert(event, days_until)
+            alert = self.alert_engine.check_economic_calendar_alert(event, event['days_until'])
             if alert:
                 alerts.append(alert)
         
         report['sections']['alerts'] = alerts
         
+        self.report_cache.set('morning_report', fingerprint, report, ttl_minutes=self.report_cache_ttl)
+        
         logger.info("Morning report generated successfully.")
         return report
     
@@ -253,12 +320,11 @@ def main():
     """Main entry point."""
     import sys
     
-    orchestrator = AntigravityOrchestrator()
-    
     # Get job type from command line args
     job_type = sys.argv[1] if len(sys.argv) > 1 else 'morning'
     
-    orchestrator.run_scheduled_job(job_type)
+    with AntigravityOrchestrator() as orchestrator:
+        orchestrator.run_scheduled_job(job_type)
 
 
 if __name__ == "__main__":
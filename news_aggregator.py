@@ -5,12 +5,21 @@ Now with rate limiting support for API calls.
 """
 
 import os
-import requests
+import re
+import time
+import calendar
 import feedparser
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 import logging
 
+# Prefer RE2 (linear-time DFA matching) when installed; stdlib re otherwise
+try:
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
 # Import rate limiter
 from rate_limiter import RateLimitedAPIClient
 
@@ -18,6 +27,12 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _compile_keyword_pattern(keywords_lower: Tuple[str, ...]):
+    """Compile lowercase keywords into a single alternation pattern."""
+    return regex_engine.compile('|'.join(regex_engine.escape(k) for k in keywords_lower))
+
+
 class NewsAggregator:
     """Aggregates financial news from multiple sources with rate limiting."""
     
@@ -40,17 +55,18 @@ class NewsAggregator:
         try:
             feed = feedparser.parse(feed_url)
             articles = []
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
+            cutoff_ts = time.time() - hours_back * 3600
             
             for entry in feed.entries[:20]:  # Limit to 20 most recent
-                published = datetime(*entry.published_parsed[:6]) if hasattr(entry, 'published_parsed') else datetime.now()
+                # published_parsed is a UTC struct_time; compare as epoch seconds
+                ts = calendar.timegm(entry.published_parsed) if hasattr(entry, 'published_parsed') else time.time()
                 
-                if published >= cutoff_time:
+                if ts >= cutoff_ts:
                     articles.append({
                         'title': entry.title,
                         'summary': entry.get('summary', ''),
                         'link': entry.link,
-                        'published': published.isoformat(),
+                        'published': datetime.utcfromtimestamp(ts).isoformat(),
                         'source': feed_url
                     })
             
@@ -72,7 +88,7 @@ class NewsAggregator:
                 'token': self.finnhub_api_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.finnhub_client.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
             articles = []
@@ -133,11 +149,15 @@ class NewsAggregator:
     def filter_by_keywords(self, articles: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, Any]]:
         """Filter articles by keywords."""
         filtered = []
-        keywords_lower = [k.lower() for k in keywords]
+        if not keywords:
+            return filtered
+        
+        # One linear scan per article instead of one substring scan per keyword
+        pattern = _compile_keyword_pattern(tuple(k.lower() for k in keywords))
         
         for article in articles:
             text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
-            if any(keyword in text for keyword in keywords_lower):
+            if pattern.search(text):
                 filtered.append(article)
         
         return filtered
@@ -3,20 +3,57 @@ Portfolio Analyzer Module (v2.0)
 Analyzes portfolio allocation, performance, and risk metrics.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+import pandas as pd
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _risk_kernel(returns: np.ndarray) -> Tuple[float, float, float]:
+    """Return (mean, volatility, max_drawdown) for a series of daily returns."""
+    avg_return = returns.mean()
+    volatility = returns.std()  # Population std, matches sum/len variance
+    
+    # Cumulative wealth curve starting at 1.0, and its running peak
+    cumulative = np.empty(returns.size + 1)
+    cumulative[0] = 1.0
+    np.cumprod(1.0 + returns, out=cumulative[1:])
+    running_max = np.maximum.accumulate(cumulative)
+    max_drawdown = ((running_max - cumulative) / running_max).max()
+    
+    return float(avg_return), float(volatility), float(max_drawdown)
+
+
 class PortfolioAnalyzer:
     """Analyzes portfolio allocation and risk."""
     
     def __init__(self):
         self.risk_free_rate = 0.04  # 4% risk-free rate assumption
     
+    @staticmethod
+    def _to_soa(holdings: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Convert list-of-dicts holdings into parallel arrays (struct-of-arrays)."""
+        n = len(holdings)
+        return {
+            'ticker': np.array([h.get('ticker') for h in holdings], dtype=object),
+            'shares': np.fromiter((h['shares'] for h in holdings), dtype=np.float64, count=n),
+            'prices': np.fromiter((h['current_price'] for h in holdings), dtype=np.float64, count=n),
+            'ac': np.array([h.get('asset_class', 'other') for h in holdings], dtype=object),
+            'sec': np.array([h.get('sector', 'other') for h in holdings], dtype=object),
+        }
+    
+    @staticmethod
+    def _group_sum(labels: np.ndarray, weights: np.ndarray) -> Dict[str, float]:
+        """Sum weights per label, keeping labels in first-seen order."""
+        codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+        sums = np.bincount(codes, weights=weights, minlength=len(uniques))
+        return dict(zip(uniques, sums.tolist()))
+    
     def analyze_allocation(self, holdings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze portfolio allocation.
@@ -32,34 +69,21 @@ class PortfolioAnalyzer:
         if not holdings:
             return {'error': 'No holdings provided'}
         
-        total_value = sum(h['shares'] * h['current_price'] for h in holdings)
+        soa = self._to_soa(holdings)
+        values = soa['shares'] * soa['prices']
+        total_value = float(values.sum())
         
-        # Asset class allocation
-        asset_class_allocation = {}
-        sector_allocation = {}
+        if total_value > 0:
+            weights = values / total_value * 100
+        else:
+            weights = np.zeros_like(values)
         
-        for holding in holdings:
-            shares = holding['shares']
-            price = holding['current_price']
-            value = shares * price
-            weight = (value / total_value) * 100 if total_value > 0 else 0
-            
-            asset_class = holding.get('asset_class', 'other')
-            sector = holding.get('sector', 'other')
-            
-            # Aggregate by asset class
-            if asset_class not in asset_class_allocation:
-                asset_class_allocation[asset_class] = 0
-            asset_class_allocation[asset_class] += weight
-            
-            # Aggregate by sector
-            if sector not in sector_allocation:
-                sector_allocation[sector] = 0
-            sector_allocation[sector] += weight
+        # Aggregate by asset class and sector
+        asset_class_allocation = self._group_sum(soa['ac'], weights)
+        sector_allocation = self._group_sum(soa['sec'], weights)
         
         # Calculate concentration risk (Herfindahl index)
-        holding_weights = [(h['shares'] * h['current_price'] / total_value) * 100 for h in holdings]
-        herfindahl_index = sum(w ** 2 for w in holding_weights) / 100
+        herfindahl_index = float(np.dot(weights, weights)) / 100
         
         concentration_risk = 'high' if herfindahl_index > 25 else 'moderate' if herfindahl_index > 15 else 'low'
         
@@ -80,16 +104,17 @@ class PortfolioAnalyzer:
         Args:
             previous_values: {ticker: previous_total_value}
         """
-        current_value = sum(h['shares'] * h['current_price'] for h in holdings)
-        
-        total_gain_loss = 0
-        for holding in holdings:
-            ticker = holding['ticker']
-            current_position_value = holding['shares'] * holding['current_price']
-            previous_value = previous_values.get(ticker, current_position_value)
-            
-            gain_loss = current_position_value - previous_value
-            total_gain_loss += gain_loss
+        soa = self._to_soa(holdings)
+        values = soa['shares'] * soa['prices']
+        current_value = float(values.sum())
+        
+        # Positions without a previous value contribute no gain/loss
+        previous = np.fromiter(
+            (previous_values.get(ticker, value) for ticker, value in zip(soa['ticker'], values.tolist())),
+            dtype=np.float64,
+            count=len(values)
+        )
+        total_gain_loss = float((values - previous).sum())
         
         previous_total_value = sum(previous_values.values())
         return_pct = (total_gain_loss / previous_total_value * 100) if previous_total_value > 0 else 0
@@ -112,10 +137,9 @@ class PortfolioAnalyzer:
         if not daily_returns:
             return {'error': 'No return data provided'}
         
-        # Calculate metrics
-        avg_return = sum(daily_returns) / len(daily_returns)
-        variance = sum((r - avg_return) ** 2 for r in daily_returns) / len(daily_returns)
-        volatility = variance ** 0.5
+        # Mean, volatility and max drawdown in vectorized passes
+        returns = np.asarray(daily_returns, dtype=np.float64)
+        avg_return, volatility, max_drawdown = _risk_kernel(returns)
         
         # Annualize (assuming 252 trading days)
         annual_return = avg_return * 252
@@ -124,20 +148,6 @@ class PortfolioAnalyzer:
         # Sharpe ratio
         sharpe_ratio = (annual_return - self.risk_free_rate) / annual_volatility if annual_volatility > 0 else 0
         
-        # Max drawdown
-        cumulative = [1]
-        for ret in daily_returns:
-            cumulative.append(cumulative[-1] * (1 + ret))
-        
-        running_max = cumulative[0]
-        max_drawdown = 0
-        for value in cumulative:
-            if value > running_max:
-                running_max = value
-            drawdown = (running_max - value) / running_max
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-        
         # Value at Risk (95% confidence, parametric)
         var_95 = avg_return - (1.65 * volatility)  # Daily VaR
         
@@ -5,31 +5,147 @@ Now with enhanced rate limiting and caching via RateLimitedAPIClient.
 """
 
 import os
+import json
 import time
+import asyncio
+import numpy as np
 import yfinance as yf
 import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 import logging
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 # Import rate limiter
 from rate_limiter import RateLimitedAPIClient, rate_limited_api_call
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Yahoo's quote endpoint accepts a comma-joined symbol list, but only with a
+# crumb tied to the session cookie that fc.yahoo.com sets (as yfinance does)
+YAHOO_QUOTE_URL = 'https://query1.finance.yahoo.com/v7/finance/quote'
+YAHOO_COOKIE_URL = 'https://fc.yahoo.com'
+YAHOO_CRUMB_URL = 'https://query1.finance.yahoo.com/v1/test/getcrumb'
+YAHOO_QUOTE_BATCH_SIZE = 20
+
+YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+FINNHUB_QUOTE_URL = 'https://finnhub.io/api/v1/quote'
+
+# Hosts this module calls directly; they get a retrying adapter on the shared session
+_PRICE_HOST_PREFIXES = ('https://query1.finance.yahoo.com/', 'https://fc.yahoo.com/', 'https://finnhub.io/')
+
+
+# Typed quote decoding: msgspec only materializes the fields declared below,
+# so the dozens of unused keys in each Yahoo quote are skipped in C.
+if msgspec is not None:
+    class FinnhubQuote(msgspec.Struct):
+        """Finnhub /quote payload (fields are null for unknown symbols)."""
+        c: Optional[float] = None
+        pc: Optional[float] = None
+        d: Optional[float] = None
+        dp: Optional[float] = None
+        h: Optional[float] = None
+        l: Optional[float] = None
+        o: Optional[float] = None
+
+    class YahooQuote(msgspec.Struct):
+        """Subset of a Yahoo v7 quote that get_batch_prices uses."""
+        symbol: str
+        regularMarketPrice: Optional[float] = None
+        regularMarketPreviousClose: Optional[float] = None
+        # Floats: Yahoo sometimes sends these as 1.0 or 3e12, and the strict
+        # decoder would reject the whole chunk over one int-typed field
+        regularMarketVolume: Optional[float] = None
+        marketCap: Optional[float] = None
+        trailingPE: Optional[float] = None
+        trailingAnnualDividendYield: Optional[float] = None
+
+    class _YahooQuoteResult(msgspec.Struct):
+        result: List[YahooQuote] = []
+
+    class _YahooQuoteResponse(msgspec.Struct):
+        quoteResponse: _YahooQuoteResult
+
+    _decode_finnhub_quote = msgspec.json.Decoder(FinnhubQuote).decode
+    _yahoo_quote_decoder = msgspec.json.Decoder(_YahooQuoteResponse)
+
+    def _decode_yahoo_quotes(content: bytes) -> List[Dict[str, Any]]:
+        # Plain dicts so the result stays JSON-serializable for the cache
+        return [msgspec.structs.asdict(q) for q in _yahoo_quote_decoder.decode(content).quoteResponse.result]
+else:
+    class FinnhubQuote(NamedTuple):
+        """Finnhub /quote payload (fields are null for unknown symbols)."""
+        c: Optional[float] = None
+        pc: Optional[float] = None
+        d: Optional[float] = None
+        dp: Optional[float] = None
+        h: Optional[float] = None
+        l: Optional[float] = None
+        o: Optional[float] = None
+
+    def _decode_finnhub_quote(content: bytes) -> FinnhubQuote:
+        data = json.loads(content)
+        return FinnhubQuote(**{field: data.get(field) for field in FinnhubQuote._fields})
+
+    def _decode_yahoo_quotes(content: bytes) -> List[Dict[str, Any]]:
+        return json.loads(content)['quoteResponse']['result']
+
 
 class PriceIntegrator:
     """Integrates market price data from multiple sources with rate limiting."""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 8):
         self.finnhub_api_key = os.environ.get('FINNHUB_API_KEY')
         self.alpha_vantage_key = os.environ.get('ALPHA_VANTAGE_API_KEY')
+        self._finnhub_params_base = {'token': self.finnhub_api_key}
         
         # Initialize rate-limited clients
         self.yahoo_client = RateLimitedAPIClient.get_client('yfinance')
         self.finnhub_client = RateLimitedAPIClient.get_client('finnhub')
         
+        # Yahoo crumb for the quote endpoint, fetched on first use
+        self._yahoo_crumb: Optional[str] = None
+        self._yahoo_crumb_lock = Lock()
+        
+        # Long-lived pool for per-ticker fallbacks: its workers keep their SQLite
+        # connections and tracker shards across get_batch_prices calls
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='price-fetch')
+    
+    def close(self):
+        """Shut down the fetch pool (the HTTP session is shared and stays open)."""
+        self._executor.shutdown(wait=True)
+    
+    @property
+    def _http(self) -> requests.Session:
+        """
+        The rate limiter's shared keep-alive session, with 5xx retries on our hosts.
+        429s are left to the rate limiter's backoff rather than retried here.
+        """
+        session = RateLimitedAPIClient.get_session()
+        if _PRICE_HOST_PREFIXES[0] not in session.adapters:
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+            )
+            for prefix in _PRICE_HOST_PREFIXES:
+                session.mount(prefix, adapter)
+        return session
+    
     def get_stock_price(self, ticker: str, source: str = 'yahoo') -> Optional[Dict[str, Any]]:
         """Get current stock price and basic info with automatic fallback."""
         # Try primary source
@@ -50,28 +166,27 @@ class PriceIntegrator:
         """Fetch price data from Yahoo Finance with rate limiting and caching."""
         def fetch():
             stock = yf.Ticker(ticker)
-            info = stock.info
-            hist = stock.history(period='1d')
+            # Two daily bars give us the previous close without the heavy .info payload
+            hist = stock.history(period='2d')
             
             if hist.empty:
                 logger.warning(f"No historical data for {ticker} from Yahoo")
                 return None
             
-            current_price = hist['Close'].iloc[-1]
-            previous_close = info.get('previousClose', current_price)
+            closes = hist['Close']
+            current_price = closes.iloc[-1]
+            previous_close = closes.iloc[-2] if len(closes) > 1 else current_price
             
+            # Price-only: fundamentals come from the batch quote or get_fundamentals()
             return {
                 'ticker': ticker,
                 'price': round(float(current_price), 2),
                 'previous_close': round(float(previous_close), 2),
                 'change': round(float(current_price - previous_close), 2),
                 'change_percent': round(((current_price - previous_close) / previous_close) * 100, 2) if previous_close != 0 else 0,
-                'volume': int(hist['Volume'].iloc[-1]) if not hist.empty else 0,
-                'market_cap': info.get('marketCap'),
-                'pe_ratio': info.get('trailingPE'),
-                'dividend_yield': info.get('dividendYield'),
+                'volume': int(hist['Volume'].iloc[-1]),
                 'source': 'yahoo',
-                'timestamp': datetime.now().isoformat()
+                'timestamp_epoch': time.time()
             }
         
         result, success = self.yahoo_client.call_with_cache_and_limit(
@@ -81,6 +196,107 @@ class PriceIntegrator:
         )
         return result if success else None
     
+    def get_fundamentals(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Market cap, P/E and dividend yield for one ticker.
+        
+        The batch quote already carries these; this is the slower .info lookup
+        for tickers it missed, so only callers that need fundamentals use it.
+        """
+        def fetch():
+            info = yf.Ticker(ticker).info
+            return {
+                'market_cap': info.get('marketCap'),
+                'pe_ratio': info.get('trailingPE'),
+                'dividend_yield': info.get('trailingAnnualDividendYield')
+            }
+        
+        result, success = self.yahoo_client.call_with_cache_and_limit(
+            fetch,
+            f"yahoo_fundamentals_{ticker}",
+            use_cache=True
+        )
+        return result if success else None
+    
+    def _get_yahoo_crumb(self, stale: Optional[str] = None) -> str:
+        """Session crumb for Yahoo's quote endpoint; pass the rejected one to renew it."""
+        with self._yahoo_crumb_lock:
+            if self._yahoo_crumb is None or self._yahoo_crumb == stale:
+                # fc.yahoo.com answers 404 but sets the cookie the crumb is bound to
+                try:
+                    self._http.get(YAHOO_COOKIE_URL, headers=YAHOO_HEADERS, timeout=10)
+                except requests.RequestException:
+                    pass
+                response = self._http.get(YAHOO_CRUMB_URL, headers=YAHOO_HEADERS, timeout=10)
+                response.raise_for_status()
+                crumb = response.text.strip()
+                if not crumb or '<' in crumb:
+                    raise ValueError("Yahoo returned no crumb")
+                self._yahoo_crumb = crumb
+            return self._yahoo_crumb
+    
+    def _get_yahoo_prices_batch(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch quotes for many tickers with one Yahoo request per 20 symbols."""
+        prices = {}
+        
+        for i in range(0, len(tickers), YAHOO_QUOTE_BATCH_SIZE):
+            chunk = tickers[i:i + YAHOO_QUOTE_BATCH_SIZE]
+            
+            def fetch(symbols=','.join(chunk)):
+                crumb = self._get_yahoo_crumb()
+                response = self._http.get(
+                    YAHOO_QUOTE_URL,
+                    params={'symbols': symbols, 'crumb': crumb},
+                    headers=YAHOO_HEADERS,
+                    timeout=10
+                )
+                if response.status_code == 401:
+                    # Crumb expired with its cookie; redo the handshake once
+                    response = self._http.get(
+                        YAHOO_QUOTE_URL,
+                        params={'symbols': symbols, 'crumb': self._get_yahoo_crumb(stale=crumb)},
+                        headers=YAHOO_HEADERS,
+                        timeout=10
+                    )
+                response.raise_for_status()
+                return _decode_yahoo_quotes(response.content)
+            
+            # One rate-limit token per chunk rather than per ticker
+            quotes, success = self.yahoo_client.call_with_cache_and_limit(
+                fetch,
+                f"yahoo_quote_batch_{','.join(chunk)}",
+                use_cache=True
+            )
+            if not success:
+                logger.warning(f"Yahoo batch quote failed for {len(chunk)} tickers, "
+                               f"falling back to per-ticker requests")
+                continue
+            if not quotes:
+                continue
+            
+            for quote in quotes:
+                current_price = quote.get('regularMarketPrice')
+                if current_price is None:
+                    continue
+                previous_close = quote.get('regularMarketPreviousClose') or current_price
+                ticker = quote['symbol']
+                
+                prices[ticker] = {
+                    'ticker': ticker,
+                    'price': round(float(current_price), 2),
+                    'previous_close': round(float(previous_close), 2),
+                    'change': round(float(current_price - previous_close), 2),
+                    'change_percent': round(((current_price - previous_close) / previous_close) * 100, 2) if previous_close != 0 else 0,
+                    'volume': int(quote.get('regularMarketVolume') or 0),
+                    'market_cap': int(quote['marketCap']) if quote.get('marketCap') is not None else None,
+                    'pe_ratio': quote.get('trailingPE'),
+                    'dividend_yield': quote.get('trailingAnnualDividendYield'),
+                    'source': 'yahoo',
+                    'timestamp_epoch': time.time()
+                }
+        
+        return prices
+    
     def _get_finnhub_price(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Fetch price data from Finnhub with rate limiting and caching."""
         if not self.finnhub_api_key:
@@ -88,28 +304,10 @@ class PriceIntegrator:
             return None
         
         def fetch():
-            url = f"https://finnhub.io/api/v1/quote"
-            params = {'symbol': ticker, 'token': self.finnhub_api_key}
-            
-            response = requests.get(url, params=params, timeout=10)
+            params = {**self._finnhub_params_base, 'symbol': ticker}
+            response = self._http.get(FINNHUB_QUOTE_URL, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
-            
-            current_price = data.get('c', 0)
-            previous_close = data.get('pc', current_price)
-            
-            return {
-                'ticker': ticker,
-                'price': round(float(current_price), 2),
-                'previous_close': round(float(previous_close), 2),
-                'change': round(float(data.get('d', 0)), 2),
-                'change_percent': round(float(data.get('dp', 0)), 2),
-                'high': round(float(data.get('h', 0)), 2),
-                'low': round(float(data.get('l', 0)), 2),
-                'open': round(float(data.get('o', 0)), 2),
-                'source': 'finnhub',
-                'timestamp': datetime.now().isoformat()
-            }
+            return self._parse_finnhub_quote(ticker, _decode_finnhub_quote(response.content))
         
         result, success = self.finnhub_client.call_with_cache_and_limit(
             fetch,
@@ -118,18 +316,127 @@ class PriceIntegrator:
         )
         return result if success else None
     
+    @staticmethod
+    def _parse_finnhub_quote(ticker: str, quote: FinnhubQuote) -> Dict[str, Any]:
+        """Normalize a decoded Finnhub /quote response."""
+        current_price = quote.c or 0.0
+        previous_close = quote.pc if quote.pc is not None else current_price
+        
+        return {
+            'ticker': ticker,
+            'price': round(float(current_price), 2),
+            'previous_close': round(float(previous_close), 2),
+            'change': round(float(quote.d or 0), 2),
+            'change_percent': round(float(quote.dp or 0), 2),
+            'high': round(float(quote.h or 0), 2),
+            'low': round(float(quote.l or 0), 2),
+            'open': round(float(quote.o or 0), 2),
+            'source': 'finnhub',
+            'timestamp_epoch': time.time()
+        }
+    
+    async def _aget_finnhub_price(self, session: 'aiohttp.ClientSession', ticker: str) -> Optional[Dict[str, Any]]:
+        """Async Finnhub quote sharing the sync path's cache, rate limiter, retries and circuit breaker."""
+        client = self.finnhub_client
+        query_key = f"finnhub_price_{ticker}"
+        
+        answer = client.begin_call(query_key)
+        if answer is not None:
+            return answer[0]
+        
+        # The token bucket blocks, so wait for it off the event loop
+        await asyncio.to_thread(client.limiter.wait_if_needed)
+        
+        params = {**self._finnhub_params_base, 'symbol': ticker}
+        for attempt in range(client.max_retries):
+            api_start = time.time()
+            try:
+                async with session.get(FINNHUB_QUOTE_URL, params=params) as response:
+                    response.raise_for_status()
+                    quote = _decode_finnhub_quote(await response.read())
+            except Exception as e:
+                wait_time = client.record_api_error(query_key, e, attempt)
+                if wait_time is None:
+                    return None
+                await asyncio.sleep(wait_time)
+                continue
+            
+            price_data = self._parse_finnhub_quote(ticker, quote)
+            client.record_api_success(query_key, price_data, time.time() - api_start, attempt)
+            return price_data
+        
+        return None
+    
+    async def get_batch_prices_async(self, tickers: List[str],
+                                     max_connections: int = 32) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch Finnhub quotes for many tickers concurrently from one event loop.
+        
+        Falls back to the thread-pool get_batch_prices when aiohttp isn't installed.
+        """
+        if not self.finnhub_api_key:
+            logger.warning("Finnhub API key not set")
+            return {}
+        
+        if aiohttp is None:
+            return await asyncio.to_thread(self.get_batch_prices, tickers, 'finnhub')
+        
+        connector = aiohttp.TCPConnector(limit=max_connections, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(self._aget_finnhub_price(session, t) for t in tickers))
+        
+        prices = {ticker: data for ticker, data in zip(tickers, results) if data}
+        logger.info(f"✅ Fetched prices for {len(prices)}/{len(tickers)} tickers (async)")
+        return prices
+    
     def get_batch_prices(self, tickers: List[str], source: str = 'yahoo') -> Dict[str, Dict[str, Any]]:
-        """Fetch prices for multiple tickers with automatic rate limiting."""
-        prices = {}
-        for ticker in tickers:
-            # Rate limiting is now handled automatically by RateLimitedAPIClient
-            price_data = self.get_stock_price(ticker, source)
-            if price_data:
-                prices[ticker] = price_data
+        """
+        Fetch prices for multiple tickers.
+        
+        Yahoo tickers are first fetched through the batched quote endpoint.
+        Anything it misses falls back to per-ticker requests on the integrator's
+        long-lived thread pool; the shared token bucket in RateLimitedAPIClient
+        still caps the overall request rate.
+        """
+        if not tickers:
+            return {}
+        
+        # Cache writes from the batch quotes and every fallback worker are collected
+        # and committed together below
+        with RateLimitedAPIClient.collect_cache_writes() as cache_rows:
+            fetched = self._get_yahoo_prices_batch(tickers) if source == 'yahoo' else {}
+        remaining = [t for t in tickers if t not in fetched]
+        
+        if remaining:
+            futures = [(ticker, self._executor.submit(self._fetch_collecting, ticker, source))
+                       for ticker in remaining]
+            
+            for ticker, future in futures:
+                try:
+                    price_data, rows = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching price for {ticker}: {e}")
+                    continue
+                cache_rows.extend(rows)
+                if price_data:
+                    fetched[ticker] = price_data
+        
+        if cache_rows:
+            self.yahoo_client.cache.set_many(cache_rows)
+        
+        # Preserve the caller's ticker order
+        prices = {t: fetched[t] for t in tickers if t in fetched}
         
         logger.info(f"✅ Fetched prices for {len(prices)}/{len(tickers)} tickers")
         return prices
     
+    def _fetch_collecting(self, ticker: str, source: str) -> Tuple[Optional[Dict[str, Any]], List[tuple]]:
+        """get_stock_price on a pool worker, returning its cache writes instead of committing them."""
+        with RateLimitedAPIClient.collect_cache_writes() as rows:
+            price_data = self.get_stock_price(ticker, source)
+        return price_data, rows
+    
     def get_turkish_stocks(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
         """Get prices for Turkish stocks (BIST)."""
         # Add .IS suffix for Istanbul Stock Exchange
@@ -179,15 +486,21 @@ class PriceIntegrator:
             if hist.empty:
                 return None
             
+            # Summary stats straight off the underlying NumPy buffers
+            close = hist['Close'].to_numpy(dtype=np.float64)
+            returns = np.diff(close) / close[:-1]
+            volatility = returns.std(ddof=1) if returns.size > 1 else float('nan')
+            
             return {
                 'ticker': ticker,
                 'period': period,
-                'data': hist.to_dict('records'),
+                # Column-major payload: one list per column instead of one dict per row
+                'data': hist.reset_index().to_dict(orient='list'),
                 'summary': {
-                    'high': round(float(hist['High'].max()), 2),
-                    'low': round(float(hist['Low'].min()), 2),
-                    'avg_volume': int(hist['Volume'].mean()),
-                    'volatility': round(float(hist['Close'].pct_change().std() * 100), 2)
+                    'high': round(float(np.nanmax(hist['High'].to_numpy())), 2),
+                    'low': round(float(np.nanmin(hist['Low'].to_numpy())), 2),
+                    'avg_volume': int(np.nanmean(hist['Volume'].to_numpy())),
+                    'volatility': round(float(volatility * 100), 2)
                 }
             }
         except Exception as e:
@@ -205,3 +518,5 @@ if __name__ == "__main__":
     # Test Turkish stocks
     turkish_stocks = integrator.get_turkish_stocks(['EREGL', 'FROTO', 'TUPRS'])
     print(f"Turkish stocks: {len(turkish_stocks)} fetched")
+    
+    integrator.close()
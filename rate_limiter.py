@@ -7,17 +7,25 @@ Author: Financial Data Management System
 Version: 2.0.0
 """
 
+import os
+import re
+import sys
 import time
 import json
 import sqlite3
 import logging
 import random
-from functools import wraps
-from datetime import datetime, timedelta
-from collections import deque
-from typing import Any, Callable, Dict, Optional, List, Tuple
-from threading import Lock, RLock
+import requests
+from requests.adapters import HTTPAdapter
+from functools import lru_cache, wraps
+from hashlib import blake2b
+from datetime import datetime
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, List, Tuple, Union
+from threading import Condition, Lock, RLock, Thread, current_thread, local
 from contextlib import contextmanager
+from dataclasses import dataclass
 from enum import Enum, auto
 
 # Configure logging
@@ -27,11 +35,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# orjson is several times faster than the stdlib for cache payloads and
+# emits bytes directly; fall back to json when it isn't installed.
+try:
+    import orjson
+    
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data, default=str,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: Any) -> str:
+        return json.dumps(data, default=str)
+    
+    _json_loads = json.loads
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
+@dataclass(frozen=True)
+class SourceConfig:
+    """Resolved rate-limit settings for one source"""
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('requests_per_second', 'max_retries', 'backoff_factor',
+                 'cache_ttl_minutes', 'timeout')
+    
+    requests_per_second: float
+    max_retries: int
+    backoff_factor: float
+    cache_ttl_minutes: int
+    timeout: int
+
+
 class RateLimitConfig:
     """Configuration for different API sources"""
     
@@ -81,14 +124,16 @@ class RateLimitConfig:
     }
     
     @classmethod
-    def get_config(cls, source: str) -> Dict[str, Any]:
-        """Get configuration for a specific source"""
-        return cls.CONFIGS.get(source, cls.CONFIGS['default'])
+    @lru_cache(maxsize=32)
+    def get_config(cls, source: str) -> SourceConfig:
+        """Get configuration for a specific source (memoized, reset by register_source)"""
+        return SourceConfig(**cls.CONFIGS.get(source, cls.CONFIGS['default']))
     
     @classmethod
     def register_source(cls, source: str, config: Dict[str, Any]):
         """Register a new source configuration"""
         cls.CONFIGS[source] = {**cls.CONFIGS['default'], **config}
+        cls.get_config.cache_clear()
 
 
 # =============================================================================
@@ -117,21 +162,40 @@ class CircuitBreaker:
         
         self._state = CircuitState.CLOSED
         self._failure_count = 0
-        self._last_failure_time: Optional[float] = None
+        self._last_failure_time: Optional[float] = None  # time.monotonic()
         self._lock = Lock()
     
     @property
     def state(self) -> CircuitState:
+        # Single attribute read is atomic; only an OPEN breaker needs the lock
+        state = self._state
+        if state is not CircuitState.OPEN:
+            return state
+        return self._check_recovery()
+    
+    def _recovery_due(self) -> bool:
+        """Whether the recovery timeout has passed since the last failure"""
+        last_failure = self._last_failure_time
+        return last_failure is not None and \
+            time.monotonic() - last_failure >= self.recovery_timeout
+    
+    def _check_recovery(self) -> CircuitState:
+        """Move OPEN -> HALF_OPEN once the recovery timeout has passed"""
+        # Still cooling down: report OPEN without taking the lock
+        if not self._recovery_due():
+            return CircuitState.OPEN
+        
         with self._lock:
-            if self._state == CircuitState.OPEN:
-                # Check if recovery timeout has passed
-                if self._last_failure_time and \
-                   time.time() - self._last_failure_time >= self.recovery_timeout:
-                    self._state = CircuitState.HALF_OPEN
+            if self._state is CircuitState.OPEN and self._recovery_due():
+                self._state = CircuitState.HALF_OPEN
             return self._state
     
     def record_success(self):
         """Record a successful call"""
+        # Nothing to reset in the common healthy case
+        if self._state is CircuitState.CLOSED and self._failure_count == 0:
+            return
+        
         with self._lock:
             self._failure_count = 0
             self._state = CircuitState.CLOSED
@@ -140,15 +204,15 @@ class CircuitBreaker:
         """Record a failed call"""
         with self._lock:
             self._failure_count += 1
-            self._last_failure_time = time.time()
+            self._last_failure_time = time.monotonic()
             
             if self._failure_count >= self.failure_threshold:
                 self._state = CircuitState.OPEN
-                logger.warning(f"Circuit breaker OPENED after {self._failure_count} failures")
+                logger.warning("Circuit breaker OPENED after %d failures", self._failure_count)
     
     def can_execute(self) -> bool:
-        """Check if a call can be made"""
-        return self.state != CircuitState.OPEN
+        """Check if a call can be made (lock-free unless an OPEN breaker is due to recover)"""
+        return self.state is not CircuitState.OPEN
     
     def __call__(self, func: Callable) -> Callable:
         """Decorator for circuit breaker"""
@@ -174,24 +238,24 @@ class CircuitBreaker:
 class TokenBucketRateLimiter:
     """
     Token Bucket algorithm for rate limiting.
-    Thread-safe with proper lock handling.
+    Thread-safe; waiters sleep exactly until enough tokens have refilled.
     """
     
     def __init__(self, requests_per_second: float, max_tokens: int = 10):
         self.rps = requests_per_second
         self.max_tokens = max_tokens
         self._tokens = float(max_tokens)
-        self._last_update = time.time()
-        self._lock = RLock()  # Reentrant lock for nested calls
+        self._last_update = time.monotonic()
+        self._cv = Condition(RLock())  # Reentrant lock for nested calls
     
     @property
     def tokens(self) -> float:
-        with self._lock:
+        with self._cv:
             return self._tokens
     
     def _refill(self):
         """Refill tokens based on elapsed time (must be called with lock held)"""
-        now = time.time()
+        now = time.monotonic()
         elapsed = now - self._last_update
         self._tokens = min(self.max_tokens, self._tokens + elapsed * self.rps)
         self._last_update = now
@@ -201,23 +265,25 @@ class TokenBucketRateLimiter:
         Acquire tokens from the bucket.
         Returns True if acquired, False if timeout exceeded.
         """
-        start_time = time.time()
+        deadline = None if timeout is None else time.monotonic() + timeout
         
-        while True:
-            with self._lock:
+        with self._cv:
+            while True:
                 self._refill()
                 
                 if self._tokens >= tokens:
                     self._tokens -= tokens
                     return True
-            
-            # Check timeout outside the lock
-            if timeout is not None and (time.time() - start_time) >= timeout:
-                return False
-            
-            # Calculate wait time (outside lock)
-            wait_time = min(0.05, tokens / self.rps / 10)
-            time.sleep(wait_time)
+                
+                # Sleep for exactly the deficit; wait() releases the lock meanwhile
+                wait_time = (tokens - self._tokens) / self.rps
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait_time = min(wait_time, remaining)
+                
+                self._cv.wait(timeout=wait_time)
     
     def wait_if_needed(self, tokens: int = 1):
         """Block until tokens are available"""
@@ -230,6 +296,34 @@ class TokenBucketRateLimiter:
         yield
 
 
+class BucketTimeCounter:
+    """
+    Approximate per-key counts over a sliding window of fixed-width time buckets.
+    Buckets rotate lazily on record(), so no background thread is needed.
+    """
+    
+    def __init__(self, num_buckets: int = 10, bucket_seconds: float = 60):
+        self.bucket_seconds = bucket_seconds
+        self._buckets: deque = deque([Counter()], maxlen=num_buckets)
+        self._bucket_start = time.monotonic()
+        self._lock = Lock()
+    
+    def _rotate(self, now: float):
+        """Start fresh buckets for every period elapsed (must be called with lock held)"""
+        elapsed = int((now - self._bucket_start) // self.bucket_seconds)
+        if elapsed > 0:
+            for _ in range(min(elapsed, self._buckets.maxlen)):
+                self._buckets.append(Counter())
+            self._bucket_start += elapsed * self.bucket_seconds
+    
+    def record(self, key: str) -> int:
+        """Count one occurrence of key and return its count across the window"""
+        with self._lock:
+            self._rotate(time.monotonic())
+            self._buckets[-1][key] += 1
+            return sum(bucket[key] for bucket in self._buckets)
+
+
 # =============================================================================
 # DATA CACHE
 # =============================================================================
@@ -237,26 +331,66 @@ class TokenBucketRateLimiter:
 class DataCache:
     """
     SQLite-based caching system for API responses.
-    Thread-safe with connection-per-call pattern.
+    Thread-safe with one persistent WAL-mode connection per thread,
+    fronted by a small in-process LRU for repeat reads.
+    Each source gets its own api_cache_<source> table so sources don't
+    share one B-tree and index.
     """
     
-    def __init__(self, db_path: str = 'data/stock_data_cache.db'):
+    _SELECT_SQL = '''SELECT data, expires_at 
+                     FROM {table} 
+                     WHERE query_key = ? AND expires_at > ?
+                  '''
+    
+    _INSERT_SQL = '''INSERT OR REPLACE INTO {table} 
+                     (query_key, data, ttl_minutes, timestamp, expires_at) 
+                     VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+                  '''
+    
+    def __init__(self, db_path: str = 'data/stock_data_cache.db',
+                 memory_size: int = 4096, memory_ttl_seconds: float = 60):
         self.db_path = db_path
         self._init_lock = Lock()
+        self._local = local()
+        
+        # source -> table name, mirrored from the api_cache_sources registry
+        self._tables: Dict[str, str] = {}
+        # table -> (select, insert) SQL, formatted once so every call passes the
+        # identical string and hits the connection's prepared-statement cache
+        self._statements: Dict[str, Tuple[str, str]] = {}
+        
+        # In-memory LRU: (source, query_key) -> (expires_at, serialized data).
+        # Entries are capped at memory_ttl_seconds so writes from other
+        # processes sharing the SQLite file are picked up reasonably fast.
+        self.memory_size = memory_size
+        self.memory_ttl_seconds = memory_ttl_seconds
+        self._mem: 'OrderedDict[Tuple[str, str], Tuple[float, Union[str, bytes]]]' = OrderedDict()
+        self._mem_lock = Lock()
+        
         self._ensure_directory()
         self._init_database()
     
     def _ensure_directory(self):
         """Ensure the data directory exists"""
-        import os
         dir_path = os.path.dirname(self.db_path)
         if dir_path and not os.path.exists(dir_path):
             os.makedirs(dir_path, exist_ok=True)
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a new database connection (thread-safe)"""
-        conn = sqlite3.connect(self.db_path, timeout=10)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; the connection's statement cache keeps queries prepared
+            # (sized for a select and insert per source plus maintenance queries)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False,
+                                   isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA mmap_size=268435456')  # 256 MiB memory-mapped reads
+            conn.execute('PRAGMA cache_size=-65536')    # 64 MiB page cache per connection
+            self._local.conn = conn
         return conn
     
     def _init_database(self):
@@ -265,102 +399,218 @@ class DataCache:
             try:
                 with self._get_connection() as conn:
                     conn.execute('''
-                        CREATE TABLE IF NOT EXISTS api_cache (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            source TEXT NOT NULL,
-                            query_key TEXT NOT NULL,
-                            data TEXT NOT NULL,
-                            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            ttl_minutes INTEGER DEFAULT 15,
-                            UNIQUE(source, query_key)
+                        CREATE TABLE IF NOT EXISTS api_cache_sources (
+                            source TEXT PRIMARY KEY,
+                            table_name TEXT NOT NULL
                         )
                     ''')
+                    self._load_tables(conn)
                     
-                    conn.execute('''
-                        CREATE INDEX IF NOT EXISTS idx_source_query 
-                        ON api_cache(source, query_key)
-                    ''')
-                    
-                    conn.execute('''
-                        CREATE INDEX IF NOT EXISTS idx_timestamp 
-                        ON api_cache(timestamp)
-                    ''')
+                    # Migrate older databases: split the shared api_cache table per source
+                    legacy = conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'api_cache'"
+                    ).fetchone()
+                    if legacy:
+                        sources = [row['source'] for row in
+                                   conn.execute('SELECT DISTINCT source FROM api_cache')]
+                        for source in sources:
+                            conn.execute(f'''
+                                INSERT OR REPLACE INTO {self._create_table(conn, source)} 
+                                (query_key, data, ttl_minutes, timestamp, expires_at)
+                                SELECT query_key, data, ttl_minutes, timestamp,
+                                       CAST(strftime('%s', timestamp) AS REAL) + ttl_minutes * 60
+                                FROM api_cache WHERE source = ?
+                            ''', (source,))
+                        conn.execute('DROP TABLE api_cache')
                     
                     conn.commit()
                     logger.info(f"Cache database initialized at {self.db_path}")
             except Exception as e:
                 logger.error(f"Error initializing cache database: {e}")
     
+    def _load_tables(self, conn: sqlite3.Connection):
+        """Refresh the source -> table map, picking up tables other processes created"""
+        for row in conn.execute('SELECT source, table_name FROM api_cache_sources'):
+            self._register_table(row['source'], row['table_name'])
+    
+    def _create_table(self, conn: sqlite3.Connection, source: str) -> str:
+        """Create (if needed) and register the cache table for a source"""
+        # The registry is authoritative: another process may already have named it
+        row = conn.execute(
+            'SELECT table_name FROM api_cache_sources WHERE source = ?', (source,)
+        ).fetchone()
+        if row:
+            table = row['table_name']
+        else:
+            # Sanitized name plus a short hash of the raw source, so sources that
+            # sanitize alike ('a-b', 'a_b') still get separate tables
+            digest = blake2b(source.encode(), digest_size=4).hexdigest()
+            table = f"api_cache_{re.sub(r'[^0-9A-Za-z_]', '_', source)}_{digest}"
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                query_key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                ttl_minutes INTEGER DEFAULT 15,
+                expires_at REAL
+            )
+        ''')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_expires ON {table}(expires_at)')
+        conn.execute(
+            'INSERT OR IGNORE INTO api_cache_sources (source, table_name) VALUES (?, ?)',
+            (source, table)
+        )
+        self._register_table(source, table)
+        return table
+    
+    def _register_table(self, source: str, table: str):
+        """Remember a source's table and pre-format its statements"""
+        if table not in self._statements:
+            self._statements[table] = (self._SELECT_SQL.format(table=table),
+                                       self._INSERT_SQL.format(table=table))
+        self._tables[source] = table
+    
+    def _table_for(self, source: str) -> str:
+        """Table holding a source's entries, created on first use"""
+        table = self._tables.get(source)
+        if table is None:
+            with self._init_lock:
+                table = self._tables.get(source) or self._create_table(self._get_connection(), source)
+        return table
+    
+    def _mem_get(self, key: Tuple[str, str]) -> Optional[Union[str, bytes]]:
+        """Return the serialized entry from the memory tier if still valid"""
+        with self._mem_lock:
+            entry = self._mem.get(key)
+            if entry is None:
+                return None
+            expires_at, data_json = entry
+            if expires_at <= time.time():
+                del self._mem[key]
+                return None
+            self._mem.move_to_end(key)
+            return data_json
+    
+    def _mem_put(self, key: Tuple[str, str], data_json: Union[str, bytes], expires_at: float):
+        """Store a serialized entry in the memory tier, evicting the LRU entry if full"""
+        expires_at = min(expires_at, time.time() + self.memory_ttl_seconds)
+        with self._mem_lock:
+            self._mem[key] = (expires_at, data_json)
+            self._mem.move_to_end(key)
+            if len(self._mem) > self.memory_size:
+                self._mem.popitem(last=False)
+    
     def get(self, source: str, query_key: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached data if still valid"""
+        # Memory tier stores serialized JSON so callers always get a fresh object
+        data_json = self._mem_get((source, query_key))
+        if data_json is not None:
+            return _json_loads(data_json)
+        
         try:
             with self._get_connection() as conn:
-                cursor = conn.execute(
-                    '''SELECT data, timestamp, ttl_minutes 
-                       FROM api_cache 
-                       WHERE source = ? AND query_key = ?
-                       ORDER BY timestamp DESC LIMIT 1
-                    ''',
-                    (source, query_key)
-                )
+                # Expired rows are filtered here and removed by clear_expired()
+                select_sql = self._statements[self._table_for(source)][0]
+                cursor = conn.execute(select_sql, (query_key, time.time()))
                 row = cursor.fetchone()
                 
                 if row:
                     data_json = row['data']
-                    timestamp_str = row['timestamp']
-                    ttl = row['ttl_minutes']
-                    
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                    age = datetime.now() - timestamp
-                    
-                    if age < timedelta(minutes=ttl):
-                        logger.debug(f"Cache hit for {source}:{query_key}")
-                        return json.loads(data_json)
-                    else:
-                        # Delete expired entry
-                        conn.execute(
-                            'DELETE FROM api_cache WHERE source = ? AND query_key = ?',
-                            (source, query_key)
-                        )
-                        conn.commit()
-                        logger.debug(f"Cache expired for {source}:{query_key}")
+                    logger.debug("Cache hit for %s:%s", source, query_key)
+                    self._mem_put((source, query_key), data_json, row['expires_at'])
+                    return _json_loads(data_json)
         except Exception as e:
-            logger.error(f"Error retrieving cache: {e}")
+            logger.error("Error retrieving cache: %s", e)
         
         return None
     
+    def _prepare_row(self, source: str, query_key: str, data: Any,
+                     ttl_minutes: int) -> Tuple[str, str, Union[str, bytes], int, float]:
+        """Serialize an entry into a cache row and publish it to the memory tier"""
+        # Handle non-JSON-serializable data
+        if hasattr(data, 'to_dict'):
+            data = data.to_dict()
+        
+        data_json = _json_dumps(data)
+        expires_at = time.time() + ttl_minutes * 60
+        self._mem_put((source, query_key), data_json, expires_at)
+        return (source, query_key, data_json, ttl_minutes, expires_at)
+    
+    def _write_rows(self, rows: List[Tuple[str, str, Union[str, bytes], int, float]]):
+        """Write rows with one executemany per source table inside a single transaction"""
+        by_table: Dict[str, List[Tuple[str, Union[str, bytes], int, float]]] = defaultdict(list)
+        for source, query_key, data_json, ttl_minutes, expires_at in rows:
+            by_table[self._table_for(source)].append((query_key, data_json, ttl_minutes, expires_at))
+        
+        conn = self._get_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for table, table_rows in by_table.items():
+                conn.executemany(self._statements[table][1], table_rows)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    
     def set(self, source: str, query_key: str, data: Any, 
             ttl_minutes: int = 15) -> bool:
         """Cache API response"""
         try:
-            # Handle non-JSON-serializable data
-            if hasattr(data, 'to_dict'):
-                data = data.to_dict()
-            
-            with self._get_connection() as conn:
-                conn.execute(
-                    '''INSERT OR REPLACE INTO api_cache 
-                       (source, query_key, data, ttl_minutes, timestamp) 
-                       VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    ''',
-                    (source, query_key, json.dumps(data, default=str), ttl_minutes)
-                )
-                conn.commit()
-                logger.debug(f"Cached {source}:{query_key} for {ttl_minutes} minutes")
-                return True
+            row = self._prepare_row(source, query_key, data, ttl_minutes)
+            self._write_rows([row])
+            logger.debug("Cached %s:%s for %s minutes", source, query_key, ttl_minutes)
+            return True
+        except Exception as e:
+            logger.error("Error setting cache: %s", e)
+            return False
+    
+    def set_many(self, rows: List[Tuple[str, str, Any, int]]) -> bool:
+        """
+        Cache several (source, query_key, data, ttl_minutes) entries in one transaction.
+        If that transaction fails, rows are retried one at a time so one bad row
+        (or a transient lock) doesn't drop the rest. Returns True if all were written.
+        """
+        try:
+            prepared = [self._prepare_row(*row) for row in rows]
         except Exception as e:
-            logger.error(f"Error setting cache: {e}")
+            logger.error("Error setting cache: %s", e)
             return False
+        
+        try:
+            self._write_rows(prepared)
+            logger.debug("Cached %d entries in one transaction", len(prepared))
+            return True
+        except Exception as e:
+            logger.warning("Batched cache write failed (%s), writing %d entries individually",
+                           e, len(prepared))
+        
+        failed = 0
+        for row in prepared:
+            try:
+                self._write_rows([row])
+            except Exception as e:
+                failed += 1
+                logger.error("Error caching %s:%s: %s", row[0], row[1], e)
+        if failed:
+            logger.error("Lost %d of %d cache entries", failed, len(prepared))
+        return not failed
     
     def clear_expired(self) -> int:
         """Clear expired cache entries, returns number deleted"""
+        now = time.time()
+        with self._mem_lock:
+            for key in [k for k, (expires_at, _) in self._mem.items() if expires_at <= now]:
+                del self._mem[key]
+        
         try:
             with self._get_connection() as conn:
-                cursor = conn.execute('''
-                    DELETE FROM api_cache 
-                    WHERE datetime(timestamp, '+' || ttl_minutes || ' minutes') < datetime('now')
-                ''')
-                deleted = cursor.rowcount
+                self._load_tables(conn)
+                deleted = 0
+                for table in set(self._tables.values()):
+                    cursor = conn.execute(
+                        f'DELETE FROM {table} WHERE expires_at < ?', (now,)
+                    )
+                    deleted += cursor.rowcount
                 conn.commit()
                 if deleted > 0:
                     logger.info(f"Cleared {deleted} expired cache entries")
@@ -371,11 +621,13 @@ class DataCache:
     
     def clear_source(self, source: str) -> int:
         """Clear all cache entries for a specific source"""
+        with self._mem_lock:
+            for key in [k for k in self._mem if k[0] == source]:
+                del self._mem[key]
+        
         try:
             with self._get_connection() as conn:
-                cursor = conn.execute(
-                    'DELETE FROM api_cache WHERE source = ?', (source,)
-                )
+                cursor = conn.execute(f'DELETE FROM {self._table_for(source)}')
                 deleted = cursor.rowcount
                 conn.commit()
                 logger.info(f"Cleared {deleted} cache entries for {source}")
@@ -384,38 +636,173 @@ class DataCache:
             logger.error(f"Error clearing source cache: {e}")
             return 0
     
+    def get_stats_batched(self, sources: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Entry counts per source (all registered sources by default) from one query"""
+        conn = self._get_connection()
+        self._load_tables(conn)
+        tables = [(source, self._tables[source]) for source in (sources or list(self._tables))
+                  if source in self._tables]
+        if not tables:
+            return {}
+        
+        # One UNION ALL statement instead of two queries per source table;
+        # "recent" (written in the last hour) is a rough cache hit rate estimate
+        sql = ' UNION ALL '.join(
+            f'''SELECT ? AS source, COUNT(*) AS entries,
+                       COALESCE(SUM(datetime(timestamp) > datetime('now', '-1 hour')), 0) AS recent
+                FROM {table}'''
+            for _, table in tables
+        )
+        return {
+            row['source']: {'entries': row['entries'], 'recent_entries': row['recent']}
+            for row in conn.execute(sql, [source for source, _ in tables])
+        }
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.execute('SELECT COUNT(*) as total FROM api_cache')
-                total = cursor.fetchone()['total']
-                
-                cursor = conn.execute('''
-                    SELECT source, COUNT(*) as count 
-                    FROM api_cache 
-                    GROUP BY source
-                ''')
-                by_source = {row['source']: row['count'] for row in cursor.fetchall()}
-                
-                # Get cache hit rate estimate (entries accessed recently)
-                cursor = conn.execute('''
-                    SELECT COUNT(*) as recent FROM api_cache 
-                    WHERE datetime(timestamp) > datetime('now', '-1 hour')
-                ''')
-                recent = cursor.fetchone()['recent']
-                
-                return {
-                    'total_entries': total,
-                    'by_source': by_source,
-                    'recent_entries': recent,
-                    'db_path': self.db_path
-                }
+            per_source = self.get_stats_batched()
+            by_source = {source: s['entries'] for source, s in per_source.items() if s['entries']}
+            
+            return {
+                'total_entries': sum(by_source.values()),
+                'by_source': by_source,
+                'recent_entries': sum(s['recent_entries'] for s in per_source.values()),
+                'db_path': self.db_path
+            }
         except Exception as e:
             logger.error(f"Error getting cache stats: {e}")
             return {}
 
 
+class RedisDataCache:
+    """
+    Redis-backed cache with the same interface as DataCache.
+    Shares entries across worker processes; expiry is handled by Redis TTLs.
+    """
+    
+    KEY_PREFIX = 'api_cache'
+    # Per-source sorted sets of recent writes (query_key -> write time), for stats.
+    # A different prefix keeps them out of KEY_PREFIX scans.
+    RECENT_PREFIX = 'api_cache_recent'
+    RECENT_WINDOW_SECONDS = 3600
+    
+    def __init__(self, redis_url: str, max_connections: int = 32):
+        if redis is None:
+            raise ImportError("redis package is required for RedisDataCache")
+        
+        self.redis_url = redis_url
+        self._redis = redis.Redis(
+            connection_pool=redis.ConnectionPool.from_url(redis_url, max_connections=max_connections)
+        )
+        logger.info(f"Redis cache initialized at {redis_url}")
+    
+    def _key(self, source: str, query_key: str) -> str:
+        return f"{self.KEY_PREFIX}:{source}:{query_key}"
+    
+    def _recent_key(self, source: str) -> str:
+        return f"{self.RECENT_PREFIX}:{source}"
+    
+    def get(self, source: str, query_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve cached data if still valid"""
+        try:
+            data_json = self._redis.get(self._key(source, query_key))
+            if data_json is not None:
+                logger.debug("Cache hit for %s:%s", source, query_key)
+                return _json_loads(data_json)
+        except Exception as e:
+            logger.error("Error retrieving cache: %s", e)
+        return None
+    
+    def set(self, source: str, query_key: str, data: Any, 
+            ttl_minutes: int = 15) -> bool:
+        """Cache API response"""
+        return self.set_many([(source, query_key, data, ttl_minutes)])
+    
+    def set_many(self, rows: List[Tuple[str, str, Any, int]]) -> bool:
+        """Cache several (source, query_key, data, ttl_minutes) entries in one round-trip"""
+        try:
+            now = time.time()
+            pipe = self._redis.pipeline(transaction=False)
+            for source, query_key, data, ttl_minutes in rows:
+                if hasattr(data, 'to_dict'):
+                    data = data.to_dict()
+                pipe.setex(self._key(source, query_key), int(ttl_minutes * 60), _json_dumps(data))
+                pipe.zadd(self._recent_key(source), {query_key: now})
+                pipe.expire(self._recent_key(source), self.RECENT_WINDOW_SECONDS)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error("Error setting cache: %s", e)
+            return False
+    
+    def clear_expired(self) -> int:
+        """Redis evicts expired keys itself"""
+        return 0
+    
+    def clear_source(self, source: str) -> int:
+        """Clear all cache entries for a specific source"""
+        try:
+            keys = list(self._redis.scan_iter(match=self._key(source, '*'), count=500))
+            deleted = self._redis.delete(*keys) if keys else 0
+            self._redis.delete(self._recent_key(source))
+            logger.info(f"Cleared {deleted} cache entries for {source}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error clearing source cache: {e}")
+            return 0
+    
+    def get_stats_batched(self, sources: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Entry counts per source (all sources by default) from one keyspace scan"""
+        prefix = f"{self.KEY_PREFIX}:"
+        by_source: Dict[str, int] = {}
+        for key in self._redis.scan_iter(match=prefix + '*', count=500):
+            # <prefix><source>:<query_key>; the source itself may contain ':'
+            source = key.decode()[len(prefix):].rsplit(':', 1)[0]
+            by_source[source] = by_source.get(source, 0) + 1
+        
+        selected = [source for source in by_source if not sources or source in sources]
+        
+        # Writes in the last hour, as DataCache reports them; old members are trimmed first
+        cutoff = time.time() - self.RECENT_WINDOW_SECONDS
+        pipe = self._redis.pipeline(transaction=False)
+        for source in selected:
+            pipe.zremrangebyscore(self._recent_key(source), '-inf', cutoff)
+            pipe.zcard(self._recent_key(source))
+        recent = pipe.execute()[1::2] if selected else []
+        
+        return {
+            source: {'entries': by_source[source], 'recent_entries': recent_count}
+            for source, recent_count in zip(selected, recent)
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        try:
+            per_source = self.get_stats_batched()
+            by_source = {source: s['entries'] for source, s in per_source.items()}
+            
+            return {
+                'total_entries': sum(by_source.values()),
+                'by_source': by_source,
+                'recent_entries': sum(s['recent_entries'] for s in per_source.values()),
+                'redis_url': self.redis_url
+            }
+        except Exception as e:
+            logger.error(f"Error getting cache stats: {e}")
+            return {}
+
+
+def create_data_cache(db_path: str = 'data/stock_data_cache.db') -> Union[DataCache, RedisDataCache]:
+    """Use Redis when REDIS_URL is configured, otherwise the SQLite DataCache"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url:
+        if redis is not None:
+            return RedisDataCache(redis_url)
+        logger.warning("REDIS_URL is set but the redis package is not installed, using SQLite cache")
+    return DataCache(db_path)
+
+
 # =============================================================================
 # API CALL TRACKER
 # =============================================================================
@@ -423,52 +810,99 @@ class DataCache:
 class APICallTracker:
     """
     Tracks API calls to monitor usage patterns.
-    Thread-safe with efficient deque operations.
+    Thread-safe without locking on record(): each thread keeps its own
+    per-source counters, which get_stats merges.
     """
     
     def __init__(self, max_history: int = 1000):
         self.max_history = max_history
-        self._calls = deque(maxlen=max_history)
-        self._lock = Lock()
+        # Only failed calls are kept, as (epoch_ts, source, endpoint, status,
+        # response_time, error) tuples; timestamps are formatted on read.
+        # deque.append is atomic, so errors need no lock either.
+        self._errors = deque(maxlen=max_history)
         
-        # Quick counters for common stats
-        self._success_count = 0
-        self._failure_count = 0
-        self._rate_limit_count = 0
-        self._cache_hit_count = 0
+        # One {source: counters} shard per thread; the lock only guards the shard list.
+        # Shards of finished threads are folded into _retired so short-lived pool
+        # workers don't pile up.
+        self._local = local()
+        self._shards: List[Tuple[Thread, Dict[str, Dict[str, float]]]] = []
+        self._retired: Dict[str, Dict[str, float]] = defaultdict(self._new_counters)
+        self._lock = Lock()
+    
+    @staticmethod
+    def _new_counters() -> Dict[str, float]:
+        return {
+            'total': 0,
+            'success': 0,
+            'cache_hits': 0,
+            'rate_limited': 0,
+            'response_time_sum': 0.0,
+            'response_time_count': 0
+        }
+    
+    def _shard(self) -> Dict[str, Dict[str, float]]:
+        """This thread's counters, registered on first use"""
+        shard = getattr(self._local, 'counters', None)
+        if shard is None:
+            shard = defaultdict(self._new_counters)
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append((current_thread(), shard))
+            self._local.counters = shard
+        return shard
+    
+    def _retire_dead_shards(self):
+        """Fold shards of finished threads into _retired (call with _lock held)"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+                continue
+            # The owner is gone, so nothing writes to this shard any more
+            for source, counters in shard.items():
+                retired = self._retired[source]
+                for key, value in counters.items():
+                    retired[key] += value
+        self._shards = alive
     
     def record(self, source: str, endpoint: str, status: str, 
                response_time: float = 0.0, error: Optional[str] = None):
         """Record an API call"""
-        with self._lock:
-            self._calls.append({
-                'timestamp': datetime.now().isoformat(),
-                'source': source,
-                'endpoint': endpoint,
-                'status': status,
-                'response_time': response_time,
-                'error': error
-            })
-            
-            # Update quick counters
-            if status == 'success':
-                self._success_count += 1
-            elif status == 'cache_hit':
-                self._cache_hit_count += 1
-            elif 'rate' in status.lower():
-                self._rate_limit_count += 1
-            else:
-                self._failure_count += 1
+        # Only this thread writes to its shard, so plain increments are safe
+        counters = self._shard()[source]
+        counters['total'] += 1
+        if status == 'success':
+            counters['success'] += 1
+        elif status == 'cache_hit':
+            counters['cache_hits'] += 1
+        if 'rate' in status.lower():
+            counters['rate_limited'] += 1
+        if response_time > 0:
+            counters['response_time_sum'] += response_time
+            counters['response_time_count'] += 1
+        
+        if error:
+            self._errors.append((time.time(), source, endpoint, status, response_time, error))
     
     def get_stats(self, source: Optional[str] = None) -> Dict[str, Any]:
         """Get statistics for API calls"""
         with self._lock:
+            self._retire_dead_shards()
+            retired = {src: dict(c) for src, c in self._retired.items()}
+            shards = [retired] + [shard for _, shard in self._shards]
+        
+        # Sum the per-thread shards (a snapshot; other threads may still be counting)
+        counters = self._new_counters()
+        for shard in shards:
             if source:
-                calls = [c for c in self._calls if c['source'] == source]
+                parts = [dict(shard[source])] if source in shard else []
             else:
-                calls = list(self._calls)
+                parts = [dict(c) for c in list(shard.values())]
+            for part in parts:
+                for key, value in part.items():
+                    counters[key] += value
         
-        if not calls:
+        if counters['total'] == 0:
             return {
                 'total_calls': 0,
                 'success': 0,
@@ -479,35 +913,47 @@ class APICallTracker:
                 'success_rate': 0
             }
         
-        total = len(calls)
-        success = sum(1 for c in calls if c['status'] == 'success')
-        cache_hits = sum(1 for c in calls if c['status'] == 'cache_hit')
-        rate_limited = sum(1 for c in calls if 'rate' in str(c.get('status', '')).lower())
-        
-        response_times = [c['response_time'] for c in calls if c['response_time'] > 0]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        total = counters['total']
+        success = counters['success']
+        cache_hits = counters['cache_hits']
+        rt_count = counters['response_time_count']
+        avg_response_time = counters['response_time_sum'] / rt_count if rt_count else 0
         
         return {
             'total_calls': total,
             'success': success,
             'failed': total - success - cache_hits,
-            'rate_limited': rate_limited,
+            'rate_limited': counters['rate_limited'],
             'cache_hits': cache_hits,
             'avg_response_time': round(avg_response_time, 3),
-            'success_rate': round((success + cache_hits) / total * 100, 1) if total > 0 else 0
+            'success_rate': round((success + cache_hits) / total * 100, 1)
         }
     
     def get_recent_errors(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent errors"""
-        with self._lock:
-            errors = [c for c in self._calls if c.get('error')]
-            return list(errors)[-limit:]
+        errors = list(self._errors)[-limit:]
+        
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'source': source,
+                'endpoint': endpoint,
+                'status': status,
+                'response_time': response_time,
+                'error': error
+            }
+            for ts, source, endpoint, status, response_time, error in errors
+        ]
 
 
 # =============================================================================
 # MAIN API CLIENT
 # =============================================================================
 
+# Error messages that indicate the provider is throttling us
+_RATE_LIMIT_RE = re.compile(r'rate[ _-]?limit|429|too many requests|quota|exceeded', re.IGNORECASE)
+
+
 class RateLimitedAPIClient:
     """
     Main API client with rate limiting, caching, retry logic, and circuit breaker.
@@ -519,52 +965,131 @@ class RateLimitedAPIClient:
     _registry_lock = Lock()
     
     # Shared resources
-    _shared_cache: Optional[DataCache] = None
+    _shared_cache: Optional[Union[DataCache, RedisDataCache]] = None
     _shared_tracker: Optional[APICallTracker] = None
+    _shared_lock = Lock()
+    
+    # Pooled HTTP transport shared by every client
+    _session: Optional[requests.Session] = None
+    
+    # Per-thread list that collect_cache_writes() diverts cache writes into
+    _write_collector = local()
     
-    def __init__(self, source: str, db_path: str = 'data/stock_data_cache.db'):
-        self.source = source
+    def __init__(self, source: str, db_path: str = 'data/stock_data_cache.db',
+                 cache: Optional[Union[DataCache, RedisDataCache]] = None):
+        # Interned so the per-call counter and cache-key lookups hit the identity fast path
+        self.source = sys.intern(source)
         config = RateLimitConfig.get_config(source)
         
         self.limiter = TokenBucketRateLimiter(
-            config['requests_per_second'],
-            max_tokens=max(10, int(config['requests_per_second'] * 10))
+            config.requests_per_second,
+            max_tokens=max(10, int(config.requests_per_second * 10))
         )
         
-        # Use shared cache and tracker
-        if RateLimitedAPIClient._shared_cache is None:
-            RateLimitedAPIClient._shared_cache = DataCache(db_path)
+        # Use shared cache and tracker (a specific cache backend may be passed in).
+        # Checked once without the lock so established clients skip it.
         if RateLimitedAPIClient._shared_tracker is None:
-            RateLimitedAPIClient._shared_tracker = APICallTracker()
+            with RateLimitedAPIClient._shared_lock:
+                if RateLimitedAPIClient._shared_tracker is None:
+                    RateLimitedAPIClient._shared_tracker = APICallTracker()
         
-        self.cache = RateLimitedAPIClient._shared_cache
+        self.cache = cache if cache is not None else RateLimitedAPIClient.get_shared_cache(db_path)
         self.tracker = RateLimitedAPIClient._shared_tracker
         
+        # Functions passed to call_with_cache_and_limit should make HTTP calls
+        # through this session so connections are kept alive between calls
+        self.session = RateLimitedAPIClient.get_session()
+        
         self.circuit_breaker = CircuitBreaker(
-            failure_threshold=config['max_retries'] + 2,
+            failure_threshold=config.max_retries + 2,
             recovery_timeout=60
         )
         
-        self.max_retries = config['max_retries']
-        self.backoff_factor = config['backoff_factor']
-        self.cache_ttl = config['cache_ttl_minutes']
-        self.timeout = config['timeout']
+        self.max_retries = config.max_retries
+        self.backoff_factor = config.backoff_factor
+        self._backoff_table = tuple(self.backoff_factor ** i for i in range(self.max_retries))
+        self.cache_ttl = config.cache_ttl_minutes
+        self.timeout = config.timeout
+        
+        # Cache misses per key over the last 10 minutes; keys missing more often
+        # than hot_key_threshold share one in-flight call instead of each
+        # waiting on the token bucket
+        self.hot_key_threshold = 5
+        self._miss_window = BucketTimeCounter(num_buckets=10, bucket_seconds=60)
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = Lock()
     
     @classmethod
     def get_client(cls, source: str, db_path: str = 'data/stock_data_cache.db') -> 'RateLimitedAPIClient':
         """Get or create a client instance (singleton pattern)"""
-        with cls._registry_lock:
-            if source not in cls._clients:
-                cls._clients[source] = cls(source, db_path)
+        # Fast path: one dict probe and no lock for existing clients
+        try:
             return cls._clients[source]
+        except KeyError:
+            pass
+        
+        with cls._registry_lock:
+            try:
+                return cls._clients[source]
+            except KeyError:
+                client = cls._clients[source] = cls(source, db_path)
+                return client
+    
+    @classmethod
+    def get_shared_cache(cls, db_path: str = 'data/stock_data_cache.db') -> Union[DataCache, RedisDataCache]:
+        """Get the cache backend shared by every client (Redis when REDIS_URL is set)"""
+        cache = cls._shared_cache
+        if cache is not None:
+            return cache
+        
+        with cls._shared_lock:
+            if cls._shared_cache is None:
+                RateLimitedAPIClient._shared_cache = create_data_cache(db_path)
+            return cls._shared_cache
+    
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Get the shared keep-alive HTTP session, creating it on first use"""
+        session = cls._session
+        if session is not None:
+            return session
+        
+        with cls._shared_lock:
+            if cls._session is None:
+                # Retries are handled by call_with_cache_and_limit, not the adapter
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=0)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                RateLimitedAPIClient._session = session
+            return cls._session
+    
+    @classmethod
+    @contextmanager
+    def collect_cache_writes(cls):
+        """
+        Hold back the cache writes this thread's API calls would make and yield
+        them as (source, query_key, data, ttl_minutes) rows, so the caller can
+        commit a whole batch with one cache.set_many().
+        """
+        outer = getattr(cls._write_collector, 'rows', None)
+        rows: List[Tuple[str, str, Any, int]] = []
+        cls._write_collector.rows = rows
+        try:
+            yield rows
+        finally:
+            cls._write_collector.rows = outer
     
     @classmethod
     def reset_clients(cls):
         """Reset all client instances (mainly for testing)"""
-        with cls._registry_lock:
+        with cls._registry_lock, cls._shared_lock:
             cls._clients.clear()
             cls._shared_cache = None
             cls._shared_tracker = None
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
     
     def call_with_cache_and_limit(
         self,
@@ -579,88 +1104,154 @@ class RateLimitedAPIClient:
         Execute API call with caching and rate limiting.
         Returns (data, success) tuple.
         """
-        # Check circuit breaker
+        # Circuit breaker and cache first
+        answer = self.begin_call(query_key, use_cache)
+        if answer is not None:
+            return answer
+        
+        if use_cache and self._miss_window.record(query_key) > self.hot_key_threshold:
+            return self._call_coalesced(func, query_key, args, kwargs, ttl_override)
+        
+        return self._call_api(func, query_key, args, kwargs, use_cache, ttl_override)
+    
+    # Bookkeeping shared with callers that drive their own (e.g. async) requests
+    
+    def begin_call(self, query_key: str, use_cache: bool = True) -> Optional[Tuple[Optional[Any], bool]]:
+        """
+        Pre-call checks: circuit breaker, then cache.
+        Returns the (data, success) answer when no API call is needed, else None.
+        """
         if not self.circuit_breaker.can_execute():
-            logger.warning(f"⚡ {self.source}: Circuit breaker OPEN, rejecting request")
+            logger.warning("⚡ %s: Circuit breaker OPEN, rejecting request", self.source)
             self.tracker.record(self.source, query_key, 'circuit_open')
             return None, False
         
-        # Try cache first
         if use_cache:
             cached_data = self.cache.get(self.source, query_key)
             if cached_data is not None:
                 self.tracker.record(self.source, query_key, 'cache_hit', 0)
                 return cached_data, True
         
+        return None
+    
+    def record_api_success(self, query_key: str, result: Any, response_time: float, attempt: int,
+                           use_cache: bool = True, ttl_override: Optional[int] = None):
+        """Book a successful API call and cache its result"""
+        self.circuit_breaker.record_success()
+        self.tracker.record(self.source, query_key, 'success', response_time)
+        
+        if use_cache and result is not None:
+            ttl = ttl_override or self.cache_ttl
+            pending = getattr(RateLimitedAPIClient._write_collector, 'rows', None)
+            if pending is not None:
+                pending.append((self.source, query_key, result, ttl))
+            else:
+                self.cache.set(self.source, query_key, result, ttl)
+        
+        logger.info("✓ %s: %s (attempt %d, %.2fs)", self.source, query_key, attempt + 1, response_time)
+    
+    def record_api_error(self, query_key: str, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Book a failed API attempt.
+        Returns the backoff delay in seconds when a rate-limited call should be
+        retried, or None when the caller should give up.
+        """
+        last_error = str(error)
+        
+        if _RATE_LIMIT_RE.search(last_error) is None:
+            self.circuit_breaker.record_failure()
+            self.tracker.record(self.source, query_key, 'error', error=last_error)
+            logger.error("✗ %s: %s - %s", self.source, query_key, last_error)
+            return None
+        
+        self.tracker.record(self.source, query_key, 'rate_limited', error=last_error)
+        
+        if attempt < self.max_retries - 1:
+            # Exponential backoff with jitter
+            wait_time = self._backoff_table[attempt] * (1.0 + 0.2 * random.random())
+            logger.warning(
+                "⚠ %s: Rate limited. Retry %d/%d in %.1fs",
+                self.source, attempt + 1, self.max_retries, wait_time
+            )
+            return wait_time
+        
+        # All retries exhausted
+        self.circuit_breaker.record_failure()
+        logger.error(
+            "✗ %s: %s failed after %d retries. Last error: %s",
+            self.source, query_key, self.max_retries, last_error
+        )
+        return None
+    
+    def _call_coalesced(self, func: Callable, query_key: str, args: tuple, kwargs: dict,
+                        ttl_override: Optional[int]) -> Tuple[Optional[Any], bool]:
+        """
+        Let one caller fetch a hot key while concurrent callers wait for its result,
+        so a burst of identical misses costs one rate-limit token instead of many.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(query_key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[query_key] = Future()
+        
+        if not is_leader:
+            result, success = future.result()
+            if success and result is not None:
+                # Re-read so each caller gets its own copy, as with a normal cache hit
+                cached_data = self.cache.get(self.source, query_key)
+                if cached_data is not None:
+                    self.tracker.record(self.source, query_key, 'cache_hit', 0)
+                    return cached_data, True
+            return result, success
+        
+        try:
+            outcome = self._call_api(func, query_key, args, kwargs, True, ttl_override)
+            future.set_result(outcome)
+            return outcome
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[query_key]
+    
+    def _call_api(self, func: Callable, query_key: str, args: tuple, kwargs: dict,
+                  use_cache: bool, ttl_override: Optional[int]) -> Tuple[Optional[Any], bool]:
+        """Rate-limited call with retries; caches successful results"""
         # Apply rate limiting
         self.limiter.wait_if_needed()
         
         # Retry logic with exponential backoff
-        last_error = None
-        ttl = ttl_override or self.cache_ttl
-        
         for attempt in range(self.max_retries):
+            api_start = time.time()
             try:
-                api_start = time.time()
                 result = func(*args, **kwargs)
-                response_time = time.time() - api_start
-                
-                # Record success
-                self.circuit_breaker.record_success()
-                self.tracker.record(self.source, query_key, 'success', response_time)
-                
-                # Cache successful result
-                if use_cache and result is not None:
-                    self.cache.set(self.source, query_key, result, ttl)
-                
-                logger.info(f"✓ {self.source}: {query_key} (attempt {attempt + 1}, {response_time:.2f}s)")
-                return result, True
-            
             except Exception as e:
-                last_error = str(e)
-                error_lower = last_error.lower()
-                
-                # Check for rate limit error
-                is_rate_limit = any(x in error_lower for x in [
-                    'rate limit', '429', 'too many requests', 'quota', 'exceeded'
-                ])
-                
-                if is_rate_limit:
-                    self.tracker.record(
-                        self.source, query_key, 'rate_limited', error=last_error
-                    )
-                    
-                    if attempt < self.max_retries - 1:
-                        # Exponential backoff with jitter
-                        wait_time = (self.backoff_factor ** attempt) * (1 + random.uniform(0, 0.2))
-                        logger.warning(
-                            f"⚠ {self.source}: Rate limited. "
-                            f"Retry {attempt + 1}/{self.max_retries} in {wait_time:.1f}s"
-                        )
-                        time.sleep(wait_time)
-                    continue
-                else:
-                    self.circuit_breaker.record_failure()
-                    self.tracker.record(
-                        self.source, query_key, 'error', error=last_error
-                    )
-                    logger.error(f"✗ {self.source}: {query_key} - {last_error}")
+                wait_time = self.record_api_error(query_key, e, attempt)
+                if wait_time is None:
                     return None, False
+                time.sleep(wait_time)
+                continue
+            
+            self.record_api_success(query_key, result, time.time() - api_start, attempt,
+                                    use_cache, ttl_override)
+            return result, True
         
-        # All retries exhausted
-        self.circuit_breaker.record_failure()
-        logger.error(
-            f"✗ {self.source}: {query_key} failed after {self.max_retries} retries. "
-            f"Last error: {last_error}"
-        )
         return None, False
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get comprehensive statistics"""
+    def get_stats(self, cache_stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Get comprehensive statistics.
+        
+        Args:
+            cache_stats: Precomputed stats for this client's cache, so callers
+                reporting on many clients query a shared cache only once.
+        """
         return {
             'source': self.source,
             'api_stats': self.tracker.get_stats(self.source),
-            'cache_stats': self.cache.get_stats(),
+            'cache_stats': cache_stats if cache_stats is not None else self.cache.get_stats(),
             'circuit_breaker': {
                 'state': self.circuit_breaker.state.name,
                 'failure_count': self.circuit_breaker._failure_count
@@ -671,6 +1262,18 @@ class RateLimitedAPIClient:
                 'max_tokens': self.limiter.max_tokens
             }
         }
+    
+    @staticmethod
+    def get_stats_for(clients: Dict[str, 'RateLimitedAPIClient']) -> Dict[str, Dict[str, Any]]:
+        """get_stats() for several clients, reading each distinct cache's stats once"""
+        cache_stats: Dict[int, Dict[str, Any]] = {}
+        stats = {}
+        for source, client in clients.items():
+            key = id(client.cache)
+            if key not in cache_stats:
+                cache_stats[key] = client.cache.get_stats()
+            stats[source] = client.get_stats(cache_stats[key])
+        return stats
 
 
 # =============================================================================
@@ -689,12 +1292,23 @@ def rate_limited_api_call(source: str, use_cache: bool = True, ttl_minutes: Opti
     def decorator(func: Callable) -> Callable:
         client = RateLimitedAPIClient.get_client(source)
         
-        @wraps(func)
-        def wrapper(*args, **kwargs):
+        def make_key(*args, **kwargs) -> str:
             # Create a unique query key from function name and arguments
             args_str = '_'.join(str(a) for a in args)
             kwargs_str = '_'.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-            query_key = f"{func.__name__}_{args_str}_{kwargs_str}".replace(' ', '_')
+            return f"{func.__name__}_{args_str}_{kwargs_str}".replace(' ', '_')
+        
+        # Repeat calls (same ticker, same options) reuse the formatted key;
+        # typed=True keeps 1 and True from sharing a key despite equal hashes
+        cached_make_key = lru_cache(maxsize=4096, typed=True)(make_key)
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                query_key = cached_make_key(*args, **kwargs)
+            except TypeError:
+                # Unhashable arguments (lists, dicts) can't be memoized
+                query_key = make_key(*args, **kwargs)
             
             result, success = client.call_with_cache_and_limit(
                 func,
@@ -731,12 +1345,23 @@ class MultiSourceDataFetcher:
             'economic': ['fred', 'world_bank']
         }
         self._clients: Dict[str, RateLimitedAPIClient] = {}
+        
+        # (data_type, preferred_source) -> source order, with the preferred
+        # source moved to the front; (data_type, None) is the default order
+        self._fallback_orders: Dict[Tuple[str, Optional[str]], Tuple[str, ...]] = {}
+        for data_type, sources in self.sources.items():
+            self._fallback_orders[(data_type, None)] = tuple(sources)
+            for preferred in sources:
+                self._fallback_orders[(data_type, preferred)] = \
+                    (preferred,) + tuple(s for s in sources if s != preferred)
     
     def get_client(self, source: str) -> RateLimitedAPIClient:
         """Get or create client for source"""
-        if source not in self._clients:
-            self._clients[source] = RateLimitedAPIClient.get_client(source)
-        return self._clients[source]
+        try:
+            return self._clients[source]
+        except KeyError:
+            client = self._clients[source] = RateLimitedAPIClient.get_client(source)
+            return client
     
     def fetch_with_fallback(
         self, 
@@ -749,11 +1374,8 @@ class MultiSourceDataFetcher:
         Fetch data with automatic fallback between sources.
         Returns (data, source_used) tuple.
         """
-        sources_to_try = self.sources.get(data_type, ['default'])
-        
-        # Move preferred source to front
-        if preferred_source and preferred_source in sources_to_try:
-            sources_to_try = [preferred_source] + [s for s in sources_to_try if s != preferred_source]
+        sources_to_try = (self._fallback_orders.get((data_type, preferred_source))
+                          or self._fallback_orders.get((data_type, None), ('default',)))
         
         for source in sources_to_try:
             if source not in fetch_funcs:
@@ -771,18 +1393,15 @@ class MultiSourceDataFetcher:
                     return result, source
                     
             except Exception as e:
-                logger.warning(f"Failed to fetch from {source}: {e}")
+                logger.warning("Failed to fetch from %s: %s", source, e)
                 continue
         
-        logger.error(f"All sources exhausted for {query_key}")
+        logger.error("All sources exhausted for %s", query_key)
         return None, None
     
     def get_all_stats(self) -> Dict[str, Any]:
         """Get statistics from all clients"""
-        return {
-            source: client.get_stats()
-            for source, client in self._clients.items()
-        }
+        return RateLimitedAPIClient.get_stats_for(self._clients)
 
 
 # =============================================================================
@@ -804,10 +1423,7 @@ class APIMonitor:
     
     def get_all_stats(self) -> Dict[str, Any]:
         """Get comprehensive statistics from all sources"""
-        stats = {}
-        for source, client in self._clients.items():
-            stats[source] = client.get_stats()
-        return stats
+        return RateLimitedAPIClient.get_stats_for(self._clients)
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status of all sources"""
@@ -0,0 +1,22 @@
+"""
+Screen Kernels
+Numeric filter/sort kernels behind the ticker screener.
+
+Plain NumPy functions: ticker_screener runs them as-is or JIT-compiles them with
+Numba for large screens, and screener_kernels_build.py compiles the same source
+ahead of time.
+"""
+
+import numpy as np
+
+
+def top_gte(values, threshold):
+    """Indices of values >= threshold, largest first (ties keep input order)."""
+    selected = np.flatnonzero(values >= threshold)
+    return selected[np.argsort(-values[selected], kind='mergesort')]
+
+
+def bot_lt(values, threshold):
+    """Indices of values < threshold, smallest first (ties keep input order)."""
+    selected = np.flatnonzero(values < threshold)
+    return selected[np.argsort(values[selected], kind='mergesort')]
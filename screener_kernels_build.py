@@ -0,0 +1,29 @@
+"""
+Screener Kernels Build
+Ahead-of-time compiles the ticker screener's filter/sort kernels with Numba.
+
+Run once at image build time (needs numba and a C compiler):
+
+    python screener_kernels_build.py
+
+This writes a screener_kernels extension module next to this file. The built
+module needs only NumPy at runtime; when it is importable, ticker_screener uses
+it instead of the plain NumPy or JIT-compiled kernels.
+"""
+
+import os
+from numba.pycc import CC
+
+from screen_kernels import bot_lt, top_gte
+
+cc = CC('screener_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Same source as the runtime kernels, exported for float64 columns
+cc.export('top_gte_f64', 'i8[:](f8[:], f8)')(top_gte)
+cc.export('bot_lt_f64', 'i8[:](f8[:], f8)')(bot_lt)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built {cc.name} in {cc.output_dir}")
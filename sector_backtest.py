@@ -6,6 +6,7 @@ Backtests sector performance strategies and analyzes sector rotation.
 from typing import Dict, List, Any
 from datetime import datetime, timedelta
 import logging
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,20 +40,21 @@ class SectorBacktest:
             if not stocks:
                 continue
             
-            # Calculate average performance
-            total_change = sum(stock.get('change_percent', 0) for stock in stocks)
-            avg_change = total_change / len(stocks) if stocks else 0
+            # One pass to pull the changes out, then vectorized reductions
+            changes = np.fromiter((stock.get('change_percent', 0) for stock in stocks),
+                                  dtype=np.float64, count=len(stocks))
             
-            # Find best and worst performers
-            sorted_stocks = sorted(stocks, key=lambda x: x.get('change_percent', 0), reverse=True)
+            # Best is the first maximum, worst the last minimum (as a stable sort would give)
+            best_idx = int(changes.argmax())
+            worst_idx = len(changes) - 1 - int(changes[::-1].argmin())
             
             sector_performance[sector_name] = {
-                'average_change_percent': round(avg_change, 2),
+                'average_change_percent': round(float(changes.mean()), 2),
                 'num_stocks': len(stocks),
-                'best_performer': sorted_stocks[0] if sorted_stocks else None,
-                'worst_performer': sorted_stocks[-1] if sorted_stocks else None,
-                'positive_stocks': len([s for s in stocks if s.get('change_percent', 0) > 0]),
-                'negative_stocks': len([s for s in stocks if s.get('change_percent', 0) < 0])
+                'best_performer': stocks[best_idx],
+                'worst_performer': stocks[worst_idx],
+                'positive_stocks': int(np.count_nonzero(changes > 0)),
+                'negative_stocks': int(np.count_nonzero(changes < 0))
             }
         
         return sector_performance
@@ -3,11 +3,56 @@ Sentiment Analyzer Module
 Analyzes market sentiment from news and social media.
 """
 
-from typing import List, Dict, Any
+import re
+import time
+from typing import Callable, List, Dict, Any, MutableMapping, Optional, Set
+import numpy as np
 from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer, normalize
 import logging
 
+# blingfire tokenizes in C; fall back to a regex word split without it
+try:
+    from blingfire import text_to_words
+    
+    def _tokenize(text: str) -> List[str]:
+        return text_to_words(text).split()
+except ImportError:
+    _tokenize = re.compile(r"[\w']+").findall
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _topic_matcher(keywords: Dict[str, List[str]]) -> Callable[[str], Set[str]]:
+    """Build a function returning the topics whose keywords occur in lowercased text."""
+    lowered = {topic: [kw.lower() for kw in kws] for topic, kws in keywords.items()}
+    if ahocorasick is None:
+        return lambda text: {topic for topic, kws in lowered.items() if any(kw in text for kw in kws)}
+    
+    # One automaton over every keyword: each article is scanned once for all topics
+    automaton = ahocorasick.Automaton()
+    always = set()  # An empty keyword matches any text
+    for topic, kws in lowered.items():
+        for kw in kws:
+            if kw:
+                automaton.add_word(kw, automaton.get(kw, frozenset()) | {topic})
+            else:
+                always.add(topic)
+    
+    if not len(automaton):
+        return lambda text: set(always)
+    automaton.make_automaton()
+    
+    def match(text: str) -> Set[str]:
+        topics = set(always)
+        for _, kw_topics in automaton.iter(text):
+            topics.update(kw_topics)
+        return topics
+    return match
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,8 +65,39 @@ class SentimentAnalyzer:
     
     def analyze_text_vader(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment using VADER (better for social media/news)."""
-        scores = self.vader.polarity_scores(text)
+        return self._format_vader_scores(self.vader.polarity_scores(text), 'vader')
+    
+    def analyze_text_lexicon(self, text: str) -> Dict[str, Any]:
+        """
+        Approximate VADER score from a plain lexicon sum.
+        
+        Skips VADER's negation, booster and punctuation rules, trading some
+        accuracy for a much cheaper per-article cost on large batches.
+        """
+        lexicon = self.vader.lexicon
+        tokens = _tokenize(text.lower())
+        valences = np.fromiter((lexicon.get(token, 0.0) for token in tokens),
+                               dtype=np.float64, count=len(tokens))
+        
+        # Same proportions VADER reports: sentiment words are shifted by 1, neutral words count 1
+        positive = valences[valences > 0]
+        negative = valences[valences < 0]
+        pos_sum = float(positive.sum() + positive.size)
+        neg_sum = float(-negative.sum() + negative.size)
+        neu_count = valences.size - positive.size - negative.size
+        total = pos_sum + neg_sum + neu_count
         
+        scores = {
+            'compound': normalize(float(valences.sum())) if valences.size else 0.0,
+            'pos': pos_sum / total if total else 0.0,
+            'neg': neg_sum / total if total else 0.0,
+            'neu': neu_count / total if total else 0.0
+        }
+        return self._format_vader_scores(scores, 'vader_lexicon')
+    
+    @staticmethod
+    def _format_vader_scores(scores: Dict[str, float], method: str) -> Dict[str, Any]:
+        """Label and round VADER-style scores."""
         # Determine overall sentiment
         compound = scores['compound']
         if compound >= 0.05:
@@ -37,7 +113,7 @@ class SentimentAnalyzer:
             'positive': round(scores['pos'], 3),
             'negative': round(scores['neg'], 3),
             'neutral': round(scores['neu'], 3),
-            'method': 'vader'
+            'method': method
         }
     
     def analyze_text_textblob(self, text: str) -> Dict[str, Any]:
@@ -60,31 +136,60 @@ class SentimentAnalyzer:
             'method': 'textblob'
         }
     
-    def analyze_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_article(self, article: Dict[str, Any], fast: bool = False) -> Dict[str, Any]:
         """Analyze sentiment of a news article."""
         title = article.get('title', '')
         summary = article.get('summary', '')
         text = f"{title}. {summary}"
         
-        # Use VADER for news sentiment
-        sentiment_data = self.analyze_text_vader(text)
+        # Use VADER for news sentiment (lexicon-only approximation when fast)
+        if fast:
+            sentiment_data = self.analyze_text_lexicon(text)
+        else:
+            sentiment_data = self.analyze_text_vader(text)
         
         return {
             **article,
             'sentiment_analysis': sentiment_data
         }
     
-    def analyze_article_batch(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Analyze sentiment for multiple articles."""
-        analyzed = []
-        for article in articles:
-            analyzed.append(self.analyze_article(article))
+    def _cached_article_score(self, article: Dict[str, Any],
+                              score_cache: MutableMapping[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Get VADER sentiment for an article, reusing scores keyed by article link."""
+        link = article.get('link')
+        if link:
+            cached = score_cache.get(link)
+            if cached is not None:
+                return cached
+        
+        sentiment_data = self.analyze_text_vader(f"{article.get('title', '')}. {article.get('summary', '')}")
+        if link:
+            # Timestamped so long-lived caches can drop old links
+            score_cache[link] = {**sentiment_data, 'scored_at': time.time()}
+        return sentiment_data
+    
+    def analyze_article_batch(self, articles: List[Dict[str, Any]], fast: bool = False) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment for multiple articles.
+        
+        Args:
+            fast: Score with the approximate lexicon path instead of full VADER.
+        """
+        analyzed = [self.analyze_article(article, fast) for article in articles]
         
         logger.info(f"Analyzed sentiment for {len(analyzed)} articles")
         return analyzed
     
-    def aggregate_sentiment(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Aggregate sentiment across multiple articles."""
+    def aggregate_sentiment(self, articles: List[Dict[str, Any]],
+                            score_cache: Optional[MutableMapping[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Aggregate sentiment across multiple articles.
+        
+        Args:
+            score_cache: Optional mapping of article link -> sentiment data. Articles
+                already in the cache are not re-scored; new scores are added to it
+                with a 'scored_at' epoch timestamp.
+        """
         if not articles:
             return {
                 'overall_sentiment': 'neutral',
@@ -92,20 +197,21 @@ class SentimentAnalyzer:
                 'sentiment_distribution': {'positive': 0, 'negative': 0, 'neutral': 0}
             }
         
-        analyzed = self.analyze_article_batch(articles)
-        
-        compounds = []
+        # Score and accumulate in one pass without building annotated article copies
+        compound_sum = 0.0
         distribution = {'positive': 0, 'negative': 0, 'neutral': 0}
         
-        for article in analyzed:
-            sentiment_data = article.get('sentiment_analysis', {})
-            compound = sentiment_data.get('compound', 0)
-            sentiment = sentiment_data.get('sentiment', 'neutral')
+        for article in articles:
+            if score_cache is None:
+                sentiment_data = self.analyze_text_vader(f"{article.get('title', '')}. {article.get('summary', '')}")
+            else:
+                sentiment_data = self._cached_article_score(article, score_cache)
             
-            compounds.append(compound)
+            compound_sum += sentiment_data.get('compound', 0)
+            sentiment = sentiment_data.get('sentiment', 'neutral')
             distribution[sentiment] = distribution.get(sentiment, 0) + 1
         
-        avg_compound = sum(compounds) / len(compounds) if compounds else 0
+        avg_compound = compound_sum / len(articles)
         
         # Determine overall sentiment
         if avg_compound >= 0.05:
@@ -141,15 +247,15 @@ class SentimentAnalyzer:
     def analyze_by_topic(self, articles: List[Dict[str, Any]], keywords: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
         """Analyze sentiment by topic/keyword groups."""
         topic_sentiments = {}
+        articles_by_topic: Dict[str, List[Dict[str, Any]]] = {topic: [] for topic in keywords}
+        match_topics = _topic_matcher(keywords)
         
-        for topic, keyword_list in keywords.items():
-            topic_articles = []
-            
-            for article in articles:
-                text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
-                if any(keyword.lower() in text for keyword in keyword_list):
-                    topic_articles.append(article)
-            
+        for article in articles:
+            text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+            for topic in match_topics(text):
+                articles_by_topic[topic].append(article)
+        
+        for topic, topic_articles in articles_by_topic.items():
             if topic_articles:
                 topic_sentiments[topic] = self.aggregate_sentiment(topic_articles)
             else:
@@ -3,148 +3,304 @@ Ticker Screener Module
 Screens stocks based on technical and fundamental criteria.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple
+from datetime import datetime
+import time
+import heapq
 import logging
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import numpy as np
 from price_integrator import PriceIntegrator
+from screen_kernels import bot_lt, top_gte
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Fixed screening universes; tuples so they double as cache keys
+TURKISH_DIVIDEND_STOCKS: Tuple[str, ...] = (
+    'EREGL', 'FROTO', 'TUPRS', 'DOAS', 'TTRAK',
+    'ISMEN', 'ENJSA', 'SAHOL', 'PETKM', 'AKBNK'
+)
+
+US_TECH_STOCKS: Tuple[str, ...] = (
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META',
+    'NVDA', 'TSLA', 'NFLX', 'AMD', 'INTC'
+)
+
+TURKISH_DIVIDEND_REASON = 'Turkish High Dividend Stock'
+
+# Screens store a reason kind plus the raw number; the text is only built on display
+_REASON_FORMATTERS = {
+    'low_pe': lambda value: f'Low P/E: {value:.2f}',
+    'dividend_yield': lambda value: f'Yield: {value*100:.2f}%',
+    'momentum': lambda value: f'Strong momentum: +{value:.2f}%',
+}
+
+
+def format_reason(result: Dict[str, Any]) -> str:
+    """Human-readable screen reason for a screen result ('' if it has none)."""
+    reason = result.get('screen_reason')
+    if reason is not None:
+        return reason
+    formatter = _REASON_FORMATTERS.get(result.get('screen_reason_kind'))
+    if formatter is None:
+        return ''
+    return formatter(result['screen_reason_value'])
+
+
+def _change_percent(data: Dict[str, Any]) -> float:
+    """Sort key for price dicts; a missing change counts as 0."""
+    return data.get('change_percent', 0)
+
+
+def _prices_to_soa(prices: Dict[str, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split price dicts into parallel float64 columns for the screen kernels.
+    
+    Returns (items, change_percent, pe_ratio, dividend_yield). A missing change
+    counts as 0; a missing, None or zero P/E or yield becomes NaN so it never
+    passes a threshold.
+    """
+    items = list(prices.values())
+    change = np.array([d.get('change_percent', 0) for d in items], dtype=np.float64)
+    pe = np.array([d.get('pe_ratio') or np.nan for d in items], dtype=np.float64)
+    div = np.array([d.get('dividend_yield') or np.nan for d in items], dtype=np.float64)
+    return items, change, pe, div
+
+
+# Screens at least this long JIT-compile the kernels with Numba when it is installed;
+# the usual ~10-ticker screens stay on NumPy and never import numba
+NUMBA_MIN_ROWS = 5000
+
+_compiled_kernels: Dict[str, Callable] = {}
+
+try:
+    # Prebuilt by screener_kernels_build.py: same kernels, no JIT warmup on first use
+    from screener_kernels import top_gte_f64, bot_lt_f64
+    _compiled_kernels.update({'top_gte': top_gte_f64, 'bot_lt': bot_lt_f64})
+except ImportError:
+    pass
+
+
+def _kernel(func: Callable, rows: int) -> Callable:
+    """
+    Pick the implementation of a screen kernel for an input of this many rows.
+    
+    Prebuilt kernels are always used. Otherwise numba is imported, and the kernel
+    compiled, only once a screen reaches NUMBA_MIN_ROWS; below that, or without
+    numba, the plain NumPy function runs.
+    """
+    compiled = _compiled_kernels.get(func.__name__)
+    if compiled is not None:
+        return compiled
+    if rows < NUMBA_MIN_ROWS:
+        return func
+    
+    try:
+        from numba import njit
+    except ImportError:
+        compiled = func
+    else:
+        compiled = njit(cache=True)(func)
+    _compiled_kernels[func.__name__] = compiled
+    return compiled
+
+
 class TickerScreener:
     """Screens stocks based on various criteria."""
     
+    # One integrator (and its HTTP connection pool) shared by every screener
+    _price_integrator: Optional[PriceIntegrator] = None
+    _price_integrator_lock = Lock()
+    
     def __init__(self):
-        self.price_integrator = PriceIntegrator()
+        if TickerScreener._price_integrator is None:
+            with TickerScreener._price_integrator_lock:
+                if TickerScreener._price_integrator is None:
+                    TickerScreener._price_integrator = PriceIntegrator()
+        self.price_integrator = TickerScreener._price_integrator
+        
+        # Batch prices per (is_turkish, ticker tuple), reused by screens run within the TTL
+        self._price_cache: Dict[Tuple[bool, Tuple[str, ...]], Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+        self._price_cache_ttl = 30.0
         
         # Turkish dividend stocks
-        self.turkish_dividend_stocks = [
-            'EREGL', 'FROTO', 'TUPRS', 'DOAS', 'TTRAK', 
-            'ISMEN', 'ENJSA', 'SAHOL', 'PETKM', 'AKBNK'
-        ]
+        self.turkish_dividend_stocks = TURKISH_DIVIDEND_STOCKS
         
         # Major US tech stocks
-        self.us_tech_stocks = [
-            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 
-            'NVDA', 'TSLA', 'NFLX', 'AMD', 'INTC'
-        ]
+        self.us_tech_stocks = US_TECH_STOCKS
+    
+    def _cached_batch(self, tickers: Sequence[str], turkish: bool = False) -> Dict[str, Dict[str, Any]]:
+        """get_batch_prices (or get_turkish_stocks) with a short in-process TTL cache."""
+        key = (turkish, tuple(tickers))
+        now = time.monotonic()
+        
+        entry = self._price_cache.get(key)
+        if entry is not None and now - entry[0] < self._price_cache_ttl:
+            return entry[1]
+        
+        if turkish:
+            prices = self.price_integrator.get_turkish_stocks(list(tickers))
+        else:
+            prices = self.price_integrator.get_batch_prices(list(tickers))
+        
+        # Copy-on-write (the two comprehensive_screen workers may land here together);
+        # stale entries are dropped so ad-hoc ticker lists don't accumulate
+        fresh = {k: v for k, v in list(self._price_cache.items())
+                 if now - v[0] < self._price_cache_ttl}
+        fresh[key] = (now, prices)
+        self._price_cache = fresh
+        return prices
+    
+    def _with_fundamentals(self, prices: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fill in P/E and dividend yield for rows that came without them.
+        
+        Per-ticker fallback quotes carry prices only; merged copies are returned so
+        the cached price dicts stay as fetched.
+        """
+        missing = [ticker for ticker, data in prices.items() if 'pe_ratio' not in data]
+        if not missing:
+            return prices
+        
+        filled = dict(prices)
+        for ticker in missing:
+            fundamentals = self.price_integrator.get_fundamentals(ticker)
+            if fundamentals:
+                filled[ticker] = {**prices[ticker], **fundamentals}
+        return filled
     
     def screen_by_performance(self, tickers: List[str], min_change_percent: float = 2.0) -> List[Dict[str, Any]]:
         """Screen stocks by daily performance."""
-        prices = self.price_integrator.get_batch_prices(tickers)
-        
-        winners = []
-        for ticker, data in prices.items():
-            if data.get('change_percent', 0) >= min_change_percent:
-                winners.append(data)
+        tickers = list(dict.fromkeys(tickers))  # Drop repeats, keep order
+        prices = self._cached_batch(tickers)
+        items, changes, _, _ = _prices_to_soa(prices)
         
-        # Sort by change_percent descending
-        winners.sort(key=lambda x: x.get('change_percent', 0), reverse=True)
+        # Filter, then stable sort by change_percent descending
+        order = _kernel(top_gte, changes.size)(changes, float(min_change_percent))
+        winners = [dict(items[i]) for i in order]  # Copies; the cache keeps the originals
         
         logger.info(f"Found {len(winners)} stocks with >{min_change_percent}% gain")
         return winners
     
     def screen_by_volume(self, tickers: List[str], min_volume_increase: float = 1.5) -> List[Dict[str, Any]]:
-        """Screen stocks by unusual volume."""
-        # This is a simplified version - would need historical avg volume for accurate screening
-        prices = self.price_integrator.get_batch_prices(tickers)
+        """
+        Screen stocks by unusual volume.
         
-        high_volume = []
-        for ticker, data in prices.items():
-            volume = data.get('volume', 0)
-            if volume > 0:  # Placeholder logic
-                high_volume.append(data)
+        Placeholder: min_volume_increase is not applied yet (that needs historical
+        average volume); this returns the 10 most traded tickers. Prices come from
+        the screener's TTL cache, so back-to-back calls don't refetch.
+        """
+        # This is a simplified version - would need historical avg volume for accurate screening
+        tickers = list(dict.fromkeys(tickers))  # Drop repeats, keep order
+        prices = self._cached_batch(tickers)
         
-        high_volume.sort(key=lambda x: x.get('volume', 0), reverse=True)
-        return high_volume[:10]  # Top 10 by volume
+        # Placeholder logic: any traded volume qualifies
+        rows = [(data.get('volume', 0), data) for data in prices.values()]
+        top = heapq.nlargest(10, (row for row in rows if row[0] > 0), key=itemgetter(0))
+        return [dict(data) for _, data in top]  # Top 10 by volume (copies; the cache keeps the originals)
     
     def screen_value_stocks(self, tickers: List[str]) -> List[Dict[str, Any]]:
         """Screen for value stocks (low P/E ratio)."""
-        prices = self.price_integrator.get_batch_prices(tickers)
-        
-        value_stocks = []
-        for ticker, data in prices.items():
-            pe_ratio = data.get('pe_ratio')
-            if pe_ratio and pe_ratio < 15:  # P/E < 15 is generally considered value
-                value_stocks.append({
-                    **data,
-                    'screen_reason': f'Low P/E: {pe_ratio:.2f}'
-                })
-        
-        value_stocks.sort(key=lambda x: x.get('pe_ratio', 999))
+        tickers = list(dict.fromkeys(tickers))  # Drop repeats, keep order
+        prices = self._with_fundamentals(self._cached_batch(tickers))
+        items, _, pe_ratios, _ = _prices_to_soa(prices)
+        
+        # P/E < 15 is generally considered value; missing or zero P/E is NaN and skipped
+        value_stocks = [
+            {**items[i], 'screen_reason_kind': 'low_pe', 'screen_reason_value': float(pe_ratios[i])}
+            for i in _kernel(bot_lt, pe_ratios.size)(pe_ratios, 15.0)
+        ]
         logger.info(f"Found {len(value_stocks)} value stocks")
         return value_stocks
     
     def screen_dividend_stocks(self, tickers: List[str], min_yield: float = 0.02) -> List[Dict[str, Any]]:
         """Screen for high dividend yield stocks."""
-        prices = self.price_integrator.get_batch_prices(tickers)
-        
-        dividend_stocks = []
-        for ticker, data in prices.items():
-            div_yield = data.get('dividend_yield')
-            if div_yield and div_yield >= min_yield:
-                dividend_stocks.append({
-                    **data,
-                    'screen_reason': f'Yield: {div_yield*100:.2f}%'
-                })
-        
-        dividend_stocks.sort(key=lambda x: x.get('dividend_yield', 0), reverse=True)
+        tickers = list(dict.fromkeys(tickers))  # Drop repeats, keep order
+        prices = self._with_fundamentals(self._cached_batch(tickers))
+        items, _, _, yields = _prices_to_soa(prices)
+        
+        dividend_stocks = [
+            {**items[i], 'screen_reason_kind': 'dividend_yield',
+             'screen_reason_value': float(yields[i])}
+            for i in _kernel(top_gte, yields.size)(yields, float(min_yield))
+        ]
         logger.info(f"Found {len(dividend_stocks)} dividend stocks with >{min_yield*100}% yield")
         return dividend_stocks
     
     def screen_turkish_dividend_stocks(self) -> List[Dict[str, Any]]:
         """Screen top Turkish dividend paying stocks."""
-        turkish_prices = self.price_integrator.get_turkish_stocks(self.turkish_dividend_stocks)
-        
-        results = []
-        for ticker, data in turkish_prices.items():
-            results.append({
-                **data,
-                'screen_reason': 'Turkish High Dividend Stock'
-            })
+        turkish_prices = self._cached_batch(self.turkish_dividend_stocks, turkish=True)
+        return self._label_turkish_dividend(turkish_prices)
+    
+    def _label_turkish_dividend(self, turkish_prices: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Tag pre-fetched Turkish prices as dividend screen results."""
+        # Copies, not in-place tags: the price dicts are shared through the TTL cache
+        results = [
+            {**data, 'screen_reason_kind': 'turkish_dividend', 'screen_reason': TURKISH_DIVIDEND_REASON}
+            for data in turkish_prices.values()
+        ]
         
         logger.info(f"Screened {len(results)} Turkish dividend stocks")
         return results
     
     def screen_momentum_stocks(self, tickers: List[str], min_change: float = 5.0) -> List[Dict[str, Any]]:
         """Screen for momentum stocks (strong positive movement)."""
-        prices = self.price_integrator.get_batch_prices(tickers)
-        
-        momentum_stocks = []
-        for ticker, data in prices.items():
-            change_pct = data.get('change_percent', 0)
-            if change_pct >= min_change:
-                momentum_stocks.append({
-                    **data,
-                    'screen_reason': f'Strong momentum: +{change_pct:.2f}%'
-                })
+        tickers = list(dict.fromkeys(tickers))  # Drop repeats, keep order
+        prices = self._cached_batch(tickers)
+        return self._filter_momentum(prices, min_change)
+    
+    def _filter_momentum(self, prices: Dict[str, Dict[str, Any]], min_change: float) -> List[Dict[str, Any]]:
+        """Momentum screen over pre-fetched prices."""
+        items, changes, _, _ = _prices_to_soa(prices)
         
-        momentum_stocks.sort(key=lambda x: x.get('change_percent', 0), reverse=True)
-        return momentum_stocks
+        return [
+            {**items[i], 'screen_reason_kind': 'momentum', 'screen_reason_value': float(changes[i])}
+            for i in _kernel(top_gte, changes.size)(changes, float(min_change))
+        ]
     
     def get_daily_movers(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get daily top movers (gainers and losers)."""
         # Combine US tech stocks for screening
         all_tickers = self.us_tech_stocks
-        prices = self.price_integrator.get_batch_prices(all_tickers)
+        prices = self._cached_batch(all_tickers)
+        return self._split_movers(prices)
+    
+    def _split_movers(self, prices: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Top gainers and losers from pre-fetched prices."""
+        quotes = prices.values()
         
-        price_list = list(prices.values())
-        price_list.sort(key=lambda x: x.get('change_percent', 0), reverse=True)
+        # Top-k selection straight off the dict view; no list is built or sorted
+        gainers = heapq.nlargest(5, quotes, key=_change_percent)
+        # Scanning in reverse makes ties resolve like the tail of a stable descending
+        # sort; flipping the result puts the worst last, as before
+        losers = heapq.nsmallest(5, reversed(quotes), key=_change_percent)[::-1]
         
+        # Copies, so callers can annotate rows without touching the cached prices
         return {
-            'gainers': price_list[:5],
-            'losers': price_list[-5:]
+            'gainers': [dict(data) for data in gainers],
+            'losers': [dict(data) for data in losers]
         }
     
     def comprehensive_screen(self) -> Dict[str, Any]:
         """Run comprehensive screening across multiple criteria."""
         logger.info("Running comprehensive stock screen...")
         
+        # Fetch each ticker set once, both concurrently, and derive every view from them
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            turkish_future = executor.submit(self._cached_batch, self.turkish_dividend_stocks,
+                                             turkish=True)
+            us_future = executor.submit(self._cached_batch, self.us_tech_stocks)
+            turkish_prices, us_prices = turkish_future.result(), us_future.result()
+        
         results = {
-            'turkish_dividend_stocks': self.screen_turkish_dividend_stocks(),
-            'us_momentum_stocks': self.screen_momentum_stocks(self.us_tech_stocks, min_change=2.0),
-            'daily_movers': self.get_daily_movers(),
-            'timestamp': __import__('datetime').datetime.now().isoformat()
+            'turkish_dividend_stocks': self._label_turkish_dividend(turkish_prices),
+            'us_momentum_stocks': self._filter_momentum(us_prices, min_change=2.0),
+            'daily_movers': self._split_movers(us_prices),
+            'timestamp': datetime.now().isoformat()
         }
         
         return results